@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture
+def query_budget(settings):
+    """Fail request which exceeds query budget of its view or does N+1."""
+    settings.QUERY_BUDGET_STRICT = True
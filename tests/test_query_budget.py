@@ -0,0 +1,25 @@
+import pytest
+from django.core.cache import cache, caches
+
+pytestmark = [pytest.mark.django_db]
+
+
+class TestQueryBudget:
+
+    @pytest.mark.parametrize('client_name', ['client', 'user_client'])
+    def test_feed_pages_fit_query_budget(self, request, client_name,
+                                         few_posts_with_group, query_budget):
+        client = request.getfixturevalue(client_name)
+        urls = (
+            '/',
+            f'/group/{few_posts_with_group.group.slug}/',
+            f'/profile/{few_posts_with_group.author.username}/',
+            f'/posts/{few_posts_with_group.id}/',
+        )
+        for url in urls:
+            cache.clear()
+            caches['template_fragments'].clear()
+            response = client.get(url)
+            assert response.status_code == 200, (
+                f'Страница `{url}` работает неправильно'
+            )
@@ -1,5 +1,19 @@
 from django.apps import AppConfig
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_out
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from . import checks  # noqa: F401
+        from .auth import forget_logged_out_user, forget_saved_user
+        from .sqlite import set_sqlite_pragmas
+        connection_created.connect(set_sqlite_pragmas)
+        user_model = get_user_model()
+        post_save.connect(forget_saved_user, sender=user_model)
+        post_delete.connect(forget_saved_user, sender=user_model)
+        user_logged_out.connect(forget_logged_out_user)
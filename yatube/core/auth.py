@@ -0,0 +1,50 @@
+from django.contrib.auth.backends import ModelBackend
+from django.db import transaction
+
+from .cache import TwoTierCache
+
+
+USER_KEY: str = 'auth-user:{pk}'
+
+user_cache = TwoTierCache(timeout=60 * 15)
+
+
+def forget_user(pk) -> None:
+    """Drop cached user now and again once the transaction commits.
+
+    A request may cache the pre-commit row in between, the second
+    delete drops it. Changes done with update() skip the signals
+    below, their callers have to call this themselves.
+    """
+    key: str = USER_KEY.format(pk=pk)
+    user_cache.delete(key)
+    transaction.on_commit(lambda: user_cache.delete(key))
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend serving request.user from TwoTierCache.
+
+    Entries are dropped on every save and delete of user, password
+    changes and logins included, and on logout. Other processes keep
+    their local copies for up to LOCAL_CACHE_TIMEOUT, see TwoTierCache.
+    """
+
+    def get_user(self, user_id):
+        key: str = USER_KEY.format(pk=user_id)
+        user = user_cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            user_cache.set(key, user)
+        return user if self.user_can_authenticate(user) else None
+
+
+def forget_saved_user(sender, instance, **kwargs) -> None:
+    """post_save and post_delete receiver of user model."""
+    forget_user(instance.pk)
+
+
+def forget_logged_out_user(sender, request, user, **kwargs) -> None:
+    if user is not None:
+        forget_user(user.pk)
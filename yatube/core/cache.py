@@ -0,0 +1,165 @@
+import math
+import pickle
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class LocalCache:
+    """Bounded in-process LRU with short lived entries.
+
+    Values are kept pickled, every get hands out a fresh copy which
+    request code may change freely.
+    """
+
+    def __init__(self, max_size: Optional[int] = None,
+                 timeout: Optional[float] = None):
+        self.max_size: int = max_size or getattr(
+            settings, 'LOCAL_CACHE_SIZE', 1000
+        )
+        self.timeout: float = timeout if timeout is not None else getattr(
+            settings, 'LOCAL_CACHE_TIMEOUT', 5
+        )
+        self.entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, data = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+        return pickle.loads(data)
+
+    def set(self, key: str, value: Any,
+            timeout: Optional[float] = None) -> None:
+        data: bytes = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        expires: float = time.monotonic() + (
+            self.timeout if timeout is None else min(timeout, self.timeout)
+        )
+        with self.lock:
+            self.entries[key] = (expires, data)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+
+class TwoTierCache:
+    """LocalCache in front of shared cache backend.
+
+    Writes and deletes go to both tiers, other processes see deletes
+    once their local entries expire, within LOCAL_CACHE_TIMEOUT. That
+    holds only for a backend shared between processes: with per-process
+    LocMemCache others keep entries until the shared timeout, which
+    check core.W001 warns about on deploy.
+    """
+
+    def __init__(self, alias: str = 'default',
+                 timeout: Optional[float] = None, **local_options):
+        self.alias = alias
+        self.timeout = timeout
+        self.local = LocalCache(**local_options)
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    def get(self, key: str) -> Any:
+        value = self.local.get(key)
+        if value is None:
+            value = self.shared.get(key)
+            if value is not None:
+                self.local.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any,
+            timeout: Optional[float] = None) -> None:
+        timeout = self.timeout if timeout is None else timeout
+        self.shared.set(key, value, timeout)
+        self.local.set(key, value, timeout)
+
+    def delete(self, key: str) -> None:
+        self.local.delete(key)
+        self.shared.delete(key)
+
+
+LOCK_KEY: str = 'lock:{key}'
+
+CACHE_LOCK_TIMEOUT: float = getattr(settings, 'CACHE_LOCK_TIMEOUT', 10)
+CACHE_STALE_TIMEOUT: int = getattr(settings, 'CACHE_STALE_TIMEOUT', 60 * 5)
+CACHE_EARLY_REFRESH_BETA: float = getattr(
+    settings, 'CACHE_EARLY_REFRESH_BETA', 1.0
+)
+LOCK_POLL_INTERVAL: float = 0.05
+
+
+def is_fresh(entry: Optional[tuple], version, beta: float) -> bool:
+    """Entry of version which is not due for refresh yet.
+
+    Refresh comes early with probability growing towards expiry and
+    with compute time, so one worker usually renews a hot entry
+    before it expires for everyone.
+    """
+    if entry is None or entry[1] != version:
+        return False
+    _, _, expires, delta = entry
+    return time.time() - delta * beta * math.log(
+        1 - random.random()
+    ) < expires
+
+
+def get_or_compute(key: str, compute: Callable[[], Any], timeout: int,
+                   version=None, alias: str = 'default',
+                   cacheable: Callable[[Any], bool] = lambda value: True,
+                   beta: float = CACHE_EARLY_REFRESH_BETA) -> Any:
+    """Cached value of key, computed by one worker at a time.
+
+    Entries outlive timeout by CACHE_STALE_TIMEOUT and remember their
+    version, so while the lock holder recomputes a stale or old
+    version entry, other workers get the stale value at once. With
+    nothing stale they wait for the holder up to CACHE_LOCK_TIMEOUT.
+    """
+    shared = caches[alias]
+    entry: Optional[tuple] = shared.get(key)
+    if is_fresh(entry, version, beta):
+        return entry[0]
+    lock_key: str = LOCK_KEY.format(key=key)
+    locked: bool = shared.add(lock_key, 1, CACHE_LOCK_TIMEOUT)
+    if not locked:
+        if entry is not None:
+            return entry[0]
+        deadline: float = time.monotonic() + CACHE_LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            entry = shared.get(key)
+            if entry is not None and entry[1] == version:
+                return entry[0]
+    try:
+        started: float = time.time()
+        value = compute()
+        if cacheable(value):
+            finished: float = time.time()
+            shared.set(key, (value, version, finished + timeout,
+                             finished - started),
+                       timeout + CACHE_STALE_TIMEOUT)
+    finally:
+        if locked:
+            shared.delete(lock_key)
+    return value
@@ -0,0 +1,28 @@
+from typing import List
+
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+
+PROCESS_LOCAL_BACKEND: str = 'django.core.cache.backends.locmem.LocMemCache'
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_auth_cache(app_configs, **kwargs) -> List[Warning]:
+    """Sessions and users cached per process outlive logouts elsewhere."""
+    backend: str = settings.CACHES['default']['BACKEND']
+    uses_cache: bool = (
+        settings.SESSION_ENGINE == 'core.sessions'
+        or 'core.auth.CachedModelBackend' in settings.AUTHENTICATION_BACKENDS
+    )
+    if not uses_cache or backend != PROCESS_LOCAL_BACKEND:
+        return []
+    return [Warning(
+        'Default cache is not shared between processes, logouts and '
+        'password changes do not reach cached sessions and users of '
+        'other processes.',
+        hint='Point the default cache to memcached or another shared '
+             'backend.',
+        obj='CACHES',
+        id='core.W001',
+    )]
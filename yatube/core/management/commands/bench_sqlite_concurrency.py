@@ -0,0 +1,107 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from core.sqlite import apply_pragmas, get_pragmas
+from posts.models import Post, User
+
+
+ROLLBACK_JOURNAL: dict = {'journal_mode': 'DELETE', 'synchronous': 'FULL',
+                          'busy_timeout': 5000}
+
+
+class Command(BaseCommand):
+    help = ('Measure feed reads per second while posts are written, with '
+            'default rollback journal and with SQLITE_PRAGMAS. Runs on a '
+            'temporary copy of the database.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--seconds', type=float, default=5)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Benchmark is for SQLite only.')
+        author_id = User.objects.values_list('pk', flat=True).first()
+        if author_id is None:
+            raise CommandError('No users, run generate_data first.')
+        sql, params = Post.objects.select_related(
+            'author', 'group'
+        ).order_by('-pub_date', '-id')[:10].query.sql_with_params()
+        read_query = (sql.replace('%s', '?'), params)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bench.sqlite3')
+            connection.ensure_connection()
+            target = sqlite3.connect(path)
+            connection.connection.backup(target)
+            target.close()
+            for title, pragmas in (('rollback journal', ROLLBACK_JOURNAL),
+                                   ('SQLITE_PRAGMAS', get_pragmas())):
+                reads, writes = self.run(path, pragmas, read_query,
+                                         author_id, options)
+                self.stdout.write(
+                    f'{title:<17} {reads:>8.0f} reads/s '
+                    f'{writes:>8.0f} writes/s'
+                )
+
+    def connect(self, path: str, pragmas: dict) -> sqlite3.Connection:
+        db = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        apply_pragmas(db, pragmas)
+        return db
+
+    def run(self, path, pragmas, read_query, author_id, options):
+        """Reads and writes per second of readers next to one writer."""
+        self.connect(path, pragmas).close()
+        self.stop = threading.Event()
+        self.lock = threading.Lock()
+        self.counts = {'read': 0, 'write': 0}
+
+        def read(db):
+            db.execute(*read_query).fetchall()
+
+        def write(db):
+            now = timezone.now().isoformat()
+            with db:
+                db.execute(
+                    'INSERT INTO posts_post '
+                    '(text, pub_date, modified, author_id) '
+                    'VALUES (?, ?, ?, ?)',
+                    ('Бенчмарк', now, now, author_id)
+                )
+
+        threads = [
+            threading.Thread(target=self.loop, args=(path, pragmas, read))
+            for _ in range(options['readers'])
+        ]
+        threads.append(
+            threading.Thread(target=self.loop, args=(path, pragmas, write))
+        )
+        for thread in threads:
+            thread.start()
+        time.sleep(options['seconds'])
+        self.stop.set()
+        for thread in threads:
+            thread.join()
+        return (self.counts['read'] / options['seconds'],
+                self.counts['write'] / options['seconds'])
+
+    def loop(self, path, pragmas, action) -> None:
+        """Repeat action on own connection until stopped, count successes."""
+        db = self.connect(path, pragmas)
+        done = 0
+        while not self.stop.is_set():
+            try:
+                action(db)
+                done += 1
+            except sqlite3.OperationalError:
+                pass
+        with self.lock:
+            self.counts[action.__name__] += done
+        db.close()
@@ -0,0 +1,50 @@
+import io
+import os
+import pstats
+from collections import defaultdict
+from typing import Dict, List
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.middleware.profiling import (get_profile_dir, get_view_name,
+                                       list_profiles)
+
+
+class Command(BaseCommand):
+    help = ('Merge profiles saved by SamplingProfilerMiddleware into top '
+            'functions per view.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', default=None,
+                            help='Profiles directory, PROFILE_DIR by '
+                                 'default.')
+        parser.add_argument('--view', action='append', default=[],
+                            help='Report only these view names.')
+        parser.add_argument('--top', type=int, default=20)
+        parser.add_argument('--sort', default='cumulative',
+                            help='pstats sort key, e.g. tottime.')
+
+    def handle(self, *args, **options):
+        directory: str = options['dir'] or get_profile_dir()
+        by_view: Dict[str, List[str]] = defaultdict(list)
+        for name in list_profiles(directory):
+            by_view[get_view_name(name)].append(os.path.join(directory,
+                                                             name))
+        if options['view']:
+            by_view = {view: paths for view, paths in by_view.items()
+                       if view in options['view']}
+        if not by_view:
+            raise CommandError(f'No profiles in {directory}.')
+        for view_name in sorted(by_view):
+            paths: List[str] = by_view[view_name]
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{view_name}: {len(paths)} requests'
+            ))
+            # OutputWrapper ends every write with a newline, pstats
+            # prints rows in fragments.
+            report = io.StringIO()
+            stats = pstats.Stats(*paths, stream=report)
+            stats.strip_dirs().sort_stats(options['sort']).print_stats(
+                options['top']
+            )
+            self.stdout.write(report.getvalue(), ending='')
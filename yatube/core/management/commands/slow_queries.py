@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from core.slow_queries import clear_slow_queries, get_slow_queries
+
+
+class Command(BaseCommand):
+    help = 'Slow SQL statements logged by SlowQueryMiddleware, worst first.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=20)
+        parser.add_argument('--sort', choices=('total', 'max', 'count'),
+                            default='total')
+        parser.add_argument('--clear', action='store_true',
+                            help='Empty the buffer after the report.')
+
+    def handle(self, *args, **options):
+        entries = sorted(get_slow_queries(), key=lambda entry: entry[
+            options['sort']
+        ], reverse=True)[:options['top']]
+        if not entries:
+            self.stdout.write('No slow queries logged.')
+        for rank, entry in enumerate(entries, 1):
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'#{rank} {entry["count"]} times, '
+                f'{entry["total"] * 1000:.1f} ms total, '
+                f'{entry["max"] * 1000:.1f} ms max, view {entry["view"]}'
+            ))
+            self.stdout.write(entry['shape'])
+            self.stdout.write(f'params: {entry["params"]}')
+            for line in entry['plan']:
+                self.stdout.write(f'  {line}')
+        if options['clear']:
+            clear_slow_queries()
@@ -0,0 +1,133 @@
+import threading
+import weakref
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+
+# Upper bounds of latency histogram buckets, seconds.
+BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1,
+                              2.5, 5, 10)
+
+
+class ViewStats:
+    """Latency histogram, time split and query count of one view."""
+
+    def __init__(self):
+        self.buckets: List[int] = [0] * (len(BUCKETS) + 1)
+        self.count: int = 0
+        self.total: float = 0
+        self.db: float = 0
+        self.template: float = 0
+        self.queries: int = 0
+
+    def observe(self, total: float, db: float, template: float,
+                queries: int) -> None:
+        self.buckets[bisect_left(BUCKETS, total)] += 1
+        self.count += 1
+        self.total += total
+        self.db += db
+        self.template += template
+        self.queries += queries
+
+    def merge(self, other: 'ViewStats') -> None:
+        for index, value in enumerate(other.buckets):
+            self.buckets[index] += value
+        self.count += other.count
+        self.total += other.total
+        self.db += other.db
+        self.template += other.template
+        self.queries += other.queries
+
+
+class ShardOwner:
+    """Kept in thread local only, so it goes away with the thread."""
+
+
+def merge_shard(target: Dict[str, ViewStats],
+                shard: Dict[str, ViewStats]) -> None:
+    for view_name, stats in list(shard.items()):
+        target.setdefault(view_name, ViewStats()).merge(stats)
+
+
+class Metrics:
+    """Per-process request metrics.
+
+    Each thread writes to its own shard, so requests never wait on a
+    lock, a scrape sums the shards up. Shard of finished thread is
+    folded into retired totals, so thread churn does not grow them.
+    """
+
+    def __init__(self):
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.shards: Dict[int, Dict[str, ViewStats]] = {}
+        self.retired: Dict[str, ViewStats] = {}
+
+    def get_shard(self) -> Dict[str, ViewStats]:
+        shard = getattr(self.local, 'shard', None)
+        if shard is None:
+            shard = self.local.shard = {}
+            self.local.owner = ShardOwner()
+            with self.lock:
+                self.shards[id(shard)] = shard
+            weakref.finalize(self.local.owner, self.retire, shard)
+        return shard
+
+    def retire(self, shard: Dict[str, ViewStats]) -> None:
+        with self.lock:
+            merge_shard(self.retired, shard)
+            del self.shards[id(shard)]
+
+    def observe(self, view_name: str, *args) -> None:
+        shard: Dict[str, ViewStats] = self.get_shard()
+        stats = shard.get(view_name)
+        if stats is None:
+            stats = shard[view_name] = ViewStats()
+        stats.observe(*args)
+
+    def collect(self) -> Dict[str, ViewStats]:
+        merged: Dict[str, ViewStats] = {}
+        with self.lock:
+            merge_shard(merged, self.retired)
+            for shard in self.shards.values():
+                merge_shard(merged, shard)
+        return merged
+
+    def clear(self) -> None:
+        with self.lock:
+            self.retired.clear()
+            for shard in self.shards.values():
+                shard.clear()
+
+
+metrics = Metrics()
+
+
+def render_metrics(collected: Dict[str, ViewStats]) -> str:
+    """Prometheus text exposition format."""
+    lines: List[str] = [
+        '# HELP yatube_request_duration_seconds Request latency by view.',
+        '# TYPE yatube_request_duration_seconds histogram',
+    ]
+    for view_name, stats in sorted(collected.items()):
+        label: str = f'view="{view_name}"'
+        cumulative: int = 0
+        for bound, value in zip(BUCKETS + ('+Inf',), stats.buckets):
+            cumulative += value
+            lines.append(f'yatube_request_duration_seconds_bucket'
+                         f'{{{label},le="{bound}"}} {cumulative}')
+        lines.append(f'yatube_request_duration_seconds_sum{{{label}}} '
+                     f'{stats.total:.6f}')
+        lines.append(f'yatube_request_duration_seconds_count{{{label}}} '
+                     f'{stats.count}')
+    for name, help_text, attribute in (
+            ('yatube_db_duration_seconds_total', 'Time spent in SQL.',
+             'db'),
+            ('yatube_template_duration_seconds_total',
+             'Time spent rendering templates.', 'template'),
+            ('yatube_db_queries_total', 'SQL queries run.', 'queries')):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} counter')
+        for view_name, stats in sorted(collected.items()):
+            lines.append(f'{name}{{view="{view_name}"}} '
+                         f'{getattr(stats, attribute):g}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,89 @@
+import cProfile
+import os
+import random
+import time
+from typing import Dict, List
+from urllib.parse import quote, unquote
+
+from django.conf import settings
+
+
+PROFILE_SUFFIX: str = '.prof'
+
+
+def get_sample_rate(view_name: str) -> float:
+    """Share of requests of view to profile, PROFILE_SAMPLE_RATES['*']
+    applies to views not listed."""
+    rates: Dict[str, float] = getattr(settings, 'PROFILE_SAMPLE_RATES', {})
+    return rates.get(view_name, rates.get('*', 0))
+
+
+def get_profile_dir() -> str:
+    return getattr(settings, 'PROFILE_DIR',
+                   os.path.join(settings.BASE_DIR, 'profiles'))
+
+
+def make_profile_name(view_name: str) -> str:
+    """File name sorting by time, view name is kept for reports."""
+    return f'{time.time_ns()}.{quote(view_name, safe="")}{PROFILE_SUFFIX}'
+
+
+def get_view_name(file_name: str) -> str:
+    return unquote(file_name.split('.', 1)[1][:-len(PROFILE_SUFFIX)])
+
+
+def list_profiles(directory: str) -> List[str]:
+    """Profile file names, oldest first."""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name for name in os.listdir(directory)
+                  if name.endswith(PROFILE_SUFFIX))
+
+
+def rotate_profiles(directory: str) -> None:
+    """Keep only the latest PROFILE_MAX_FILES profiles."""
+    names: List[str] = list_profiles(directory)
+    extra: int = len(names) - getattr(settings, 'PROFILE_MAX_FILES', 500)
+    for name in names[:max(extra, 0)]:
+        try:
+            os.remove(os.path.join(directory, name))
+        except FileNotFoundError:
+            pass
+
+
+class SamplingProfilerMiddleware:
+    """Run sampled requests of view under cProfile, save .prof files.
+
+    Must be the last middleware: profiler is started in process_view
+    and stopped once the response is back, so the view, exception
+    handling and templates rendered by it are profiled as the handler
+    runs them. Requests not sampled cost one dictionary lookup and one
+    random number.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            return self.get_response(request)
+        finally:
+            profiler = getattr(request, '_profiler', None)
+            if profiler is not None:
+                profiler.disable()
+                self.save(profiler, request.resolver_match.view_name)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        rate: float = get_sample_rate(request.resolver_match.view_name)
+        if rate and random.random() < rate:
+            request._profiler = cProfile.Profile()
+            request._profiler.enable()
+        return None
+
+    def save(self, profiler: cProfile.Profile, view_name: str) -> None:
+        directory: str = get_profile_dir()
+        os.makedirs(directory, exist_ok=True)
+        profiler.dump_stats(
+            os.path.join(directory, make_profile_name(view_name))
+        )
+        rotate_profiles(directory)
@@ -0,0 +1,106 @@
+import logging
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection
+from django.urls import URLResolver, get_resolver
+
+
+logger = logging.getLogger(__name__)
+
+SQL_LITERALS = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)'), '(...)'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\s+'), ' '),
+)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Request ran more queries than its view may or repeated a query."""
+
+
+def normalize_sql(sql: str) -> str:
+    """Shape of statement with literals and IN lists folded."""
+    for pattern, replacement in SQL_LITERALS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def get_query_budgets(urlconf: Optional[str] = None) -> Dict[str, int]:
+    """Budgets declared as query_budgets in included urls modules."""
+    return collect_query_budgets(urlconf or settings.ROOT_URLCONF)
+
+
+@lru_cache(maxsize=None)
+def collect_query_budgets(urlconf: str) -> Dict[str, int]:
+    """Walk of resolver, done once per urlconf."""
+    budgets: Dict[str, int] = {}
+    for pattern in get_resolver(urlconf).url_patterns:
+        if not isinstance(pattern, URLResolver) or not pattern.namespace:
+            continue
+        declared = getattr(pattern.urlconf_module, 'query_budgets', {})
+        for url_name, budget in declared.items():
+            budgets[f'{pattern.namespace}:{url_name}'] = budget
+    return budgets
+
+
+class QueryRecorder:
+    """Execute wrapper remembering every statement of request."""
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.statements.append(sql)
+        return execute(sql, params, many, context)
+
+    def get_repeated(self, limit: int) -> List[Tuple[str, int]]:
+        """Shapes run more than limit times, the N+1 suspects."""
+        shapes = Counter(normalize_sql(sql) for sql in self.statements)
+        return [(shape, count) for shape, count in shapes.most_common()
+                if count > limit]
+
+
+class QueryBudgetMiddleware:
+    """Check query count of view against its budget and look for N+1.
+
+    Problems are logged, with QUERY_BUDGET_STRICT they raise
+    QueryBudgetExceeded instead, which is what tests want.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+        match = getattr(request, 'resolver_match', None)
+        if match is not None:
+            self.check(match.view_name, recorder,
+                       getattr(request, 'urlconf', None))
+        return response
+
+    def check(self, view_name: str, recorder: QueryRecorder,
+              urlconf: Optional[str] = None) -> None:
+        problems: List[str] = []
+        budget = get_query_budgets(urlconf).get(view_name)
+        if budget is not None and len(recorder.statements) > budget:
+            problems.append(
+                f'{view_name} ran {len(recorder.statements)} queries, '
+                f'budget is {budget}'
+            )
+        limit: int = getattr(settings, 'QUERY_BUDGET_REPEAT_LIMIT', 3)
+        for shape, count in recorder.get_repeated(limit):
+            problems.append(f'{view_name} repeated {count} times: {shape}')
+        if not problems:
+            return
+        if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+            raise QueryBudgetExceeded('\n'.join(problems))
+        for problem in problems:
+            logger.warning(problem)
@@ -0,0 +1,42 @@
+import time
+from typing import Optional
+
+from django.conf import settings
+from django.db import connection
+
+from core.slow_queries import record_slow_query
+
+
+class SlowQueryLogger:
+    """Execute wrapper passing statements over threshold on."""
+
+    def __init__(self, request, threshold: float):
+        self.request = request
+        self.threshold = threshold
+
+    def __call__(self, execute, sql, params, many, context):
+        started: float = time.perf_counter()
+        result = execute(sql, params, many, context)
+        elapsed: float = time.perf_counter() - started
+        if elapsed >= self.threshold and not many:
+            record_slow_query(sql, params, elapsed, self.get_view_name())
+        return result
+
+    def get_view_name(self) -> Optional[str]:
+        match = getattr(self.request, 'resolver_match', None)
+        return match.view_name if match else self.request.path
+
+
+class SlowQueryMiddleware:
+    """Log statements slower than SLOW_QUERY_THRESHOLD seconds.
+
+    See core.slow_queries and the slow_queries command.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        threshold: float = getattr(settings, 'SLOW_QUERY_THRESHOLD', 0.1)
+        with connection.execute_wrapper(SlowQueryLogger(request, threshold)):
+            return self.get_response(request)
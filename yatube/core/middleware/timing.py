@@ -0,0 +1,76 @@
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from django.conf import settings
+from django.db import connection
+
+from core.metrics import metrics
+
+
+class RequestTiming:
+    """Time split of one request.
+
+    SQL time is filled by the execute wrapper below, template time by
+    core.template_backends.
+    """
+
+    def __init__(self):
+        self.db: float = 0
+        self.queries: int = 0
+        self.template: float = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started: float = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - started
+            self.queries += 1
+
+
+current_timing: ContextVar = ContextVar(
+    'current_timing', default=None
+)
+
+
+def get_metrics_view_name(request) -> Optional[str]:
+    match = getattr(request, 'resolver_match', None)
+    if match is None or match.namespace not in getattr(
+            settings, 'METRICS_NAMESPACES', ('posts', 'users', 'about')):
+        return None
+    return match.view_name
+
+
+class ServerTimingMiddleware:
+    """Server-Timing header of SQL, template and app time per request.
+
+    Views of METRICS_NAMESPACES are also counted in core.metrics,
+    served at /metrics.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timing = RequestTiming()
+        token = current_timing.set(timing)
+        started: float = time.perf_counter()
+        try:
+            with connection.execute_wrapper(timing):
+                response = self.get_response(request)
+        finally:
+            current_timing.reset(token)
+        total: float = time.perf_counter() - started
+        app: float = max(total - timing.db - timing.template, 0)
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={timing.db * 1000:.1f};desc="{timing.queries} queries"',
+            f'tpl;dur={timing.template * 1000:.1f}',
+            f'app;dur={app * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ))
+        view_name: Optional[str] = get_metrics_view_name(request)
+        if view_name is not None:
+            metrics.observe(view_name, total, timing.db, timing.template,
+                            timing.queries)
+        return response
@@ -0,0 +1,34 @@
+from django.contrib.sessions.backends import cached_db
+
+from .cache import LocalCache
+
+
+local_sessions = LocalCache()
+
+
+class SessionStore(cached_db.SessionStore):
+    """cached_db sessions with in-process LRU in front of the cache.
+
+    Requests without session cookie touch neither cache nor database.
+    """
+
+    def load(self) -> dict:
+        if self.session_key is None:
+            return {}
+        data = local_sessions.get(self.cache_key)
+        if data is not None:
+            return data
+        data = super().load()
+        if self.session_key is not None:
+            local_sessions.set(self.cache_key, data)
+        return data
+
+    def save(self, must_create: bool = False) -> None:
+        super().save(must_create)
+        local_sessions.set(self.cache_key, self._session)
+
+    def delete(self, session_key=None) -> None:
+        key = session_key or self.session_key
+        super().delete(session_key)
+        if key is not None:
+            local_sessions.delete(self.cache_key_prefix + key)
@@ -0,0 +1,122 @@
+import hashlib
+import logging
+import threading
+from typing import List, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+
+from core.middleware.query_budget import normalize_sql
+
+
+logger = logging.getLogger(__name__)
+
+# Slow statements deduplicated by shape: repeats update count, total
+# and max of one entry. A new shape takes the next slot of a ring of
+# SLOW_QUERY_BUFFER_SIZE slots from incr under a process lock, the
+# shape holding that slot before is dropped. Memcached and Redis make
+# incr atomic across processes too, with file based cache concurrent
+# processes may lose single updates of each other.
+SLOW_QUERY_SLOT_KEY: str = 'slow-queries:{slot}'
+SLOW_QUERY_SHAPE_KEY: str = 'slow-queries:shape:{digest}'
+SLOW_QUERY_NEXT_KEY: str = 'slow-queries:next'
+
+lock = threading.Lock()
+
+
+def get_slow_query_cache():
+    """Cache shared by processes, so commands see what servers logged."""
+    return caches[getattr(settings, 'SLOW_QUERY_CACHE', 'default')]
+
+
+def get_buffer_size() -> int:
+    return getattr(settings, 'SLOW_QUERY_BUFFER_SIZE', 200)
+
+
+def get_slot_keys() -> List[str]:
+    return [SLOW_QUERY_SLOT_KEY.format(slot=slot)
+            for slot in range(get_buffer_size())]
+
+
+def get_shape_key(shape: str) -> str:
+    digest: str = hashlib.md5(shape.encode()).hexdigest()
+    return SLOW_QUERY_SHAPE_KEY.format(digest=digest)
+
+
+def take_slot(cache, shape_key: str) -> None:
+    """Next slot of ring for new shape, the oldest shape goes away."""
+    cache.add(SLOW_QUERY_NEXT_KEY, 0, timeout=None)
+    try:
+        number: int = cache.incr(SLOW_QUERY_NEXT_KEY)
+    except ValueError:
+        # Counter went away between add and incr.
+        number = 0
+    slot_key: str = SLOW_QUERY_SLOT_KEY.format(
+        slot=number % get_buffer_size()
+    )
+    evicted: Optional[str] = cache.get(slot_key)
+    if evicted is not None and evicted != shape_key:
+        cache.delete(evicted)
+    cache.set(slot_key, shape_key, timeout=None)
+
+
+def explain(sql: str, params) -> List[str]:
+    """EXPLAIN QUERY PLAN of SELECT, run past execute wrappers."""
+    if connection.vendor != 'sqlite' or not sql.lstrip().upper().startswith(
+            ('SELECT', 'WITH')):
+        return []
+    from django.db.backends.sqlite3.base import SQLiteCursorWrapper
+    cursor = SQLiteCursorWrapper(connection.connection)
+    try:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+    except Exception as error:
+        return [f'EXPLAIN failed: {error}']
+    finally:
+        cursor.close()
+
+
+def record_slow_query(sql: str, params, elapsed: float,
+                      view_name: Optional[str]) -> None:
+    """Log statement and count it in the entry of its shape.
+
+    The slowest occurrence keeps its params, view and plan.
+    """
+    shape: str = normalize_sql(sql)
+    logger.warning('%.1f ms in %s: %s', elapsed * 1000, view_name, shape)
+    cache = get_slow_query_cache()
+    key: str = get_shape_key(shape)
+    seen: Optional[dict] = cache.get(key)
+    # EXPLAIN runs outside the lock, only for a new slowest occurrence.
+    slowest: Optional[dict] = None
+    if seen is None or elapsed >= seen['max']:
+        slowest = {'max': elapsed, 'params': repr(params)[:500],
+                   'view': view_name, 'plan': explain(sql, params)}
+    with lock:
+        entry: Optional[dict] = cache.get(key)
+        if entry is None:
+            take_slot(cache, key)
+            entry = {'shape': shape, 'count': 0, 'total': 0, 'max': 0,
+                     'params': '', 'view': view_name, 'plan': []}
+        entry['count'] += 1
+        entry['total'] += elapsed
+        if slowest is not None and elapsed >= entry['max']:
+            entry.update(slowest)
+        cache.set(key, entry, timeout=None)
+
+
+def get_slot_shape_keys(cache) -> List[str]:
+    return list(cache.get_many(get_slot_keys()).values())
+
+
+def get_slow_queries() -> List[dict]:
+    """Entries of shapes held by the ring."""
+    cache = get_slow_query_cache()
+    return list(cache.get_many(get_slot_shape_keys(cache)).values())
+
+
+def clear_slow_queries() -> None:
+    cache = get_slow_query_cache()
+    cache.delete_many([*get_slot_shape_keys(cache), *get_slot_keys(),
+                       SLOW_QUERY_NEXT_KEY])
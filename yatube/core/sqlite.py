@@ -0,0 +1,58 @@
+import logging
+import random
+import time
+from functools import wraps
+from typing import Dict, Union
+
+from django.conf import settings
+from django.db import OperationalError, connection
+
+
+logger = logging.getLogger(__name__)
+
+Pragmas = Dict[str, Union[int, str]]
+
+
+def get_pragmas() -> Pragmas:
+    return getattr(settings, 'SQLITE_PRAGMAS', {})
+
+
+def apply_pragmas(db, pragmas: Pragmas) -> None:
+    """Set pragmas through sqlite3 connection or cursor."""
+    for name, value in pragmas.items():
+        db.execute(f'PRAGMA {name} = {value}')
+
+
+def set_sqlite_pragmas(sender, connection, **kwargs) -> None:
+    """connection_created receiver tuning every new SQLite connection."""
+    if connection.vendor != 'sqlite':
+        return
+    # Raw DB-API connection, pragmas are no queries of any request.
+    apply_pragmas(connection.connection, get_pragmas())
+
+
+def is_locked_error(error: OperationalError) -> bool:
+    return 'database is locked' in str(error)
+
+
+def retry_on_locked(view):
+    """Run write view again with backoff when SQLite is locked.
+
+    Only requests outside of transaction are retried, inside of one
+    the whole transaction is doomed anyway.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        attempts: int = getattr(settings, 'SQLITE_LOCKED_RETRIES', 5)
+        delay: float = getattr(settings, 'SQLITE_LOCKED_BACKOFF', 0.05)
+        for attempt in range(1, attempts + 1):
+            try:
+                return view(request, *args, **kwargs)
+            except OperationalError as error:
+                if (not is_locked_error(error) or attempt == attempts
+                        or connection.in_atomic_block):
+                    raise
+                logger.warning('%s locked, attempt %s', request.path,
+                               attempt)
+                time.sleep(delay * 2 ** (attempt - 1) * random.uniform(1, 2))
+    return wrapper
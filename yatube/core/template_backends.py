@@ -0,0 +1,39 @@
+import time
+from typing import Optional
+
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+from core.middleware.timing import RequestTiming, current_timing
+
+
+class TimedTemplate(Template):
+    """Template adding its render time to the current request timing.
+
+    Only templates loaded through the backend are timed, included ones
+    render inside of them and are not counted twice.
+    """
+
+    def render(self, context=None, request=None) -> str:
+        timing: Optional[RequestTiming] = current_timing.get()
+        if timing is None:
+            return super().render(context, request)
+        started: float = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timing.template += time.perf_counter() - started
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates backend handing out TimedTemplate."""
+
+    def from_string(self, template_code) -> TimedTemplate:
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name) -> TimedTemplate:
+        try:
+            return TimedTemplate(self.engine.get_template(template_name),
+                                 self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
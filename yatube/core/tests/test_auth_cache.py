@@ -0,0 +1,89 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.checks import check_shared_auth_cache
+from posts.deletion import schedule_deletion
+
+
+User = get_user_model()
+
+
+class CachedSessionAndUserTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth',
+                                            password='old-password-1')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def get_auth_queries(self, client, url='/about/author/') -> list:
+        with CaptureQueriesContext(connection) as queries:
+            client.get(url)
+        return [query['sql'] for query in queries
+                if 'django_session' in query['sql']
+                or 'auth_user' in query['sql']]
+
+    def test_logged_in_requests_skip_database(self):
+        """Сессия и пользователь берутся из кеша."""
+        self.client.get('/about/author/')
+        self.assertEqual(self.get_auth_queries(self.client), [])
+
+    def test_anonymous_requests_skip_session_table(self):
+        """Гость без cookie не обращается к таблице сессий."""
+        self.assertEqual(self.get_auth_queries(Client()), [])
+
+    def test_logout_drops_session(self):
+        """После выхода старая cookie сессии не действует."""
+        cookie = self.client.cookies['sessionid'].value
+        self.client.get(reverse('users:logout'))
+        other = Client()
+        other.cookies['sessionid'] = cookie
+        response = other.get(reverse('posts:post_create'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_password_change_logs_out_other_sessions(self):
+        """Смена пароля сбрасывает кеш и другие сессии."""
+        other = Client()
+        other.force_login(self.user)
+        other.get('/about/author/')
+        self.client.post(reverse('users:password_change'), {
+            'old_password': 'old-password-1',
+            'new_password1': 'new-password-2',
+            'new_password2': 'new-password-2',
+        })
+        response = other.get(reverse('posts:post_create'))
+        self.assertEqual(response.status_code, 302)
+        response = self.client.get(reverse('posts:post_create'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_user_edit_refreshes_cached_user(self):
+        """Правка пользователя видна в следующем запросе."""
+        self.client.get('/about/author/')
+        self.user.username = 'renamed'
+        self.user.save()
+        response = self.client.get('/about/author/')
+        self.assertEqual(response.context['user'].username, 'renamed')
+
+    def test_scheduled_deletion_logs_user_out(self):
+        """Пользователь в очереди на удаление сразу теряет вход."""
+        self.client.get('/about/author/')
+        schedule_deletion(self.user)
+        response = self.client.get(reverse('posts:post_create'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_deploy_warns_about_process_local_cache(self):
+        """Проверка --deploy предупреждает о кеше внутри процесса."""
+        warnings = check_shared_auth_cache(None)
+        self.assertEqual([warning.id for warning in warnings], ['core.W001'])
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': '/tmp/yatube-test-shared-cache',
+        }}):
+            self.assertEqual(check_shared_auth_cache(None), [])
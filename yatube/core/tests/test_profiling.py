@@ -0,0 +1,64 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from core.middleware.profiling import (get_view_name, list_profiles,
+                                       make_profile_name)
+
+
+class SamplingProfilerTest(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def test_sampled_views_are_profiled_and_reported(self):
+        """Выбранные запросы профилируются, отчет собирается по view."""
+        with override_settings(PROFILE_DIR=self.directory,
+                               PROFILE_SAMPLE_RATES={'posts:index': 1}):
+            self.client.get('/')
+            self.client.get('/about/author/')
+        self.assertEqual(len(list_profiles(self.directory)), 1)
+        out = StringIO()
+        call_command('profile_report', dir=self.directory, top=5,
+                     stdout=out)
+        self.assertIn('posts:index: 1 requests', out.getvalue())
+        self.assertIn('ncalls  tottime  percall  cumtime  percall '
+                      'filename:lineno(function)', out.getvalue())
+        # ncalls, tottime, percall, cumtime, percall, then the function.
+        self.assertRegex(out.getvalue(), r'(?m)^\s+1\s+(\d+\.\d+\s+){4}'
+                                         r'views\.py:\d+\(index\)$')
+
+    def test_old_profiles_are_rotated(self):
+        """В каталоге остаются только последние PROFILE_MAX_FILES."""
+        with override_settings(PROFILE_DIR=self.directory,
+                               PROFILE_SAMPLE_RATES={'*': 1},
+                               PROFILE_MAX_FILES=2):
+            for _ in range(4):
+                self.client.get('/about/tech/')
+        names = list_profiles(self.directory)
+        self.assertEqual(len(names), 2)
+        self.assertTrue(all(os.path.getsize(
+            os.path.join(self.directory, name)
+        ) for name in names))
+
+    def test_view_errors_are_handled_and_profiled(self):
+        """Ошибка во view обрабатывается как обычно и попадает в профиль."""
+        with override_settings(PROFILE_DIR=self.directory,
+                               PROFILE_SAMPLE_RATES={'posts:profile': 1}):
+            response = self.client.get('/profile/missing/')
+        self.assertEqual(response.status_code, 404)
+        names = list_profiles(self.directory)
+        self.assertEqual([get_view_name(name) for name in names],
+                         ['posts:profile'])
+
+    def test_view_name_survives_file_name(self):
+        """Имя view восстанавливается из имени файла без искажений."""
+        for view_name in ('posts:index', 'app:post-list', 'a-b:c-d:e'):
+            with self.subTest(view_name=view_name):
+                self.assertEqual(
+                    get_view_name(make_profile_name(view_name)), view_name
+                )
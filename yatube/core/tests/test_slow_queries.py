@@ -0,0 +1,99 @@
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from core.slow_queries import (get_slow_queries, get_slow_query_cache,
+                               record_slow_query)
+
+
+@override_settings(SLOW_QUERY_THRESHOLD=0)
+class SlowQueryLogTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Buffer of its own, the one of running servers stays intact.
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.server_dir = settings.CACHES['slow_queries']['LOCATION']
+        caches = override_settings(CACHES={
+            **settings.CACHES,
+            'slow_queries': {**settings.CACHES['slow_queries'],
+                             'LOCATION': directory.name},
+        })
+        caches.enable()
+        self.addCleanup(caches.disable)
+
+    def test_slow_queries_are_grouped_with_plan(self):
+        """Медленные запросы группируются по форме и хранят план."""
+        with self.assertLogs('core.slow_queries', 'WARNING'):
+            self.client.get('/')
+            # Second render, not the anonymous page cache.
+            cache.clear()
+            self.client.get('/')
+        entries = get_slow_queries()
+        self.assertTrue(entries)
+        self.assertTrue(all(entry['view'] == 'posts:index'
+                            for entry in entries))
+        self.assertTrue(all(entry['count'] == 2 for entry in entries))
+        self.assertTrue(any(entry['plan'] for entry in entries))
+
+    @override_settings(SLOW_QUERY_BUFFER_SIZE=1)
+    def test_buffer_keeps_latest_shapes(self):
+        """Буфер хранит не больше SLOW_QUERY_BUFFER_SIZE форм."""
+        with self.assertLogs('core.slow_queries', 'WARNING'):
+            self.client.get('/')
+        self.assertEqual(len(get_slow_queries()), 1)
+
+    @override_settings(SLOW_QUERY_BUFFER_SIZE=2)
+    def test_repeats_update_one_entry(self):
+        """Частый запрос не вытесняет редкие, повторы только считаются."""
+        with self.assertLogs('core.slow_queries', 'WARNING'):
+            record_slow_query('SELECT 1 FROM posts_group', (), 0.5,
+                              'posts:group_list')
+            for number in range(10):
+                record_slow_query('SELECT %s FROM posts_post', (number,),
+                                  0.1 + number / 100, 'posts:index')
+        entries = {entry['view']: entry for entry in get_slow_queries()}
+        self.assertEqual(set(entries), {'posts:group_list', 'posts:index'})
+        self.assertEqual(entries['posts:index']['count'], 10)
+        self.assertAlmostEqual(entries['posts:index']['total'], 1.45)
+        self.assertAlmostEqual(entries['posts:index']['max'], 0.19)
+        self.assertEqual(entries['posts:index']['params'], '(9,)')
+        with self.assertLogs('core.slow_queries', 'WARNING'):
+            record_slow_query('SELECT 1 FROM auth_user', (), 0.3, None)
+        self.assertEqual(
+            {entry['view'] for entry in get_slow_queries()},
+            {'posts:index', None}
+        )
+
+    def test_command_prints_report(self):
+        """slow_queries выводит отчет и очищает буфер."""
+        with self.assertLogs('core.slow_queries', 'WARNING'):
+            self.client.get('/')
+        out = StringIO()
+        call_command('slow_queries', clear=True, stdout=out)
+        self.assertIn('#1 ', out.getvalue())
+        self.assertIn('view posts:index', out.getvalue())
+        self.assertFalse(get_slow_queries())
+
+    def test_buffer_lives_in_temporary_directory(self):
+        """Тесты пишут в свой каталог, а не в буфер серверов."""
+        self.assertNotEqual(get_slow_query_cache()._dir, self.server_dir)
+
+    def test_concurrent_records_all_counted(self):
+        """Одновременные записи не затирают друг друга."""
+        with self.assertLogs('core.slow_queries', 'WARNING'):
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                list(pool.map(
+                    lambda number: record_slow_query(
+                        'UPDATE posts_post SET text = %s', (number,),
+                        0.2, 'posts:post_edit'
+                    ),
+                    range(40)
+                ))
+        entries = get_slow_queries()
+        self.assertEqual([entry['count'] for entry in entries], [40])
@@ -0,0 +1,68 @@
+from django.db import OperationalError, connection
+from django.test import (RequestFactory, SimpleTestCase, TestCase,
+                         override_settings)
+
+from core.sqlite import retry_on_locked
+
+
+class SQLitePragmasTest(TestCase):
+    @override_settings(SQLITE_PRAGMAS={'busy_timeout': 1234,
+                                       'synchronous': 'OFF'})
+    def test_connection_gets_pragmas(self):
+        """Каждое соединение с SQLite получает настройки из SQLITE_PRAGMAS."""
+        # sqlite3 itself sets busy_timeout 5000, so values differ from it.
+        db = connection.copy()
+        try:
+            with db.cursor() as cursor:
+                cursor.execute('PRAGMA busy_timeout')
+                self.assertEqual(cursor.fetchone()[0], 1234)
+                cursor.execute('PRAGMA synchronous')
+                self.assertEqual(cursor.fetchone()[0], 0)
+        finally:
+            db.close()
+
+
+@override_settings(SQLITE_LOCKED_RETRIES=3, SQLITE_LOCKED_BACKOFF=0)
+class RetryOnLockedTest(SimpleTestCase):
+    def setUp(self):
+        self.request = RequestFactory().post('/create/')
+
+    def make_view(self, *errors):
+        calls = []
+
+        @retry_on_locked
+        def view(request):
+            calls.append(request)
+            if len(calls) <= len(errors):
+                raise errors[len(calls) - 1]
+            return 'ok'
+        return view, calls
+
+    def test_locked_database_is_retried(self):
+        """Запрос повторяется, пока база заблокирована."""
+        locked = OperationalError('database is locked')
+        view, calls = self.make_view(locked, locked)
+        with self.assertLogs('core.sqlite', 'WARNING') as logs:
+            self.assertEqual(view(self.request), 'ok')
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(logs.output, [
+            'WARNING:core.sqlite:/create/ locked, attempt 1',
+            'WARNING:core.sqlite:/create/ locked, attempt 2',
+        ])
+
+    def test_retries_are_limited(self):
+        """После исчерпания попыток ошибка пробрасывается."""
+        locked = OperationalError('database is locked')
+        view, calls = self.make_view(locked, locked, locked)
+        with self.assertLogs('core.sqlite', 'WARNING') as logs:
+            with self.assertRaises(OperationalError):
+                view(self.request)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(len(logs.output), 2)
+
+    def test_other_errors_are_not_retried(self):
+        """Прочие ошибки базы не повторяются."""
+        view, calls = self.make_view(OperationalError('no such table'))
+        with self.assertRaises(OperationalError):
+            view(self.request)
+        self.assertEqual(len(calls), 1)
@@ -0,0 +1,84 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from core.cache import LOCK_KEY, get_or_compute, is_fresh
+
+
+COMPUTE_TIME: float = 0.1
+
+
+class StampedeTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+        self.calls_lock = threading.Lock()
+
+    def compute(self) -> str:
+        with self.calls_lock:
+            self.calls += 1
+        time.sleep(COMPUTE_TIME)
+        return 'page'
+
+    def test_cold_key_computed_once(self):
+        """Одновременные запросы холодного ключа считают значение один раз."""
+        with ThreadPoolExecutor(max_workers=10) as pool:
+            results = list(pool.map(
+                lambda _: get_or_compute('key', self.compute, 60),
+                range(10)
+            ))
+        self.assertEqual(results, ['page'] * 10)
+        self.assertEqual(self.calls, 1)
+
+    def test_stale_value_served_while_locked(self):
+        """Пока другой воркер пересчитывает, отдается устаревшее значение."""
+        get_or_compute('key', self.compute, 60, version=1)
+        cache.add(LOCK_KEY.format(key='key'), 1)
+        value = get_or_compute('key', lambda: 'new', 60, version=2)
+        self.assertEqual(value, 'page')
+        self.assertEqual(self.calls, 1)
+
+    def test_early_refresh_before_expiry(self):
+        """Близкая к истечению запись обновляется заранее."""
+        entry = ('page', 1, time.time() + 1, COMPUTE_TIME)
+        with mock.patch('core.cache.random.random', return_value=0.5):
+            self.assertTrue(is_fresh(entry, 1, beta=1))
+        with mock.patch('core.cache.random.random', return_value=0.9999):
+            self.assertFalse(is_fresh(entry, 1, beta=10))
+        self.assertFalse(is_fresh(entry, 2, beta=1))
+
+    def test_p99_flat_during_invalidation_bursts(self):
+        """Нагрузочный тест: p99 не растет при частых инвалидациях."""
+        version = [0]
+        latencies = []
+        stop = threading.Event()
+        get_or_compute('feed', self.compute, 60, version=0)
+
+        def reader():
+            own = []
+            while not stop.is_set():
+                started = time.perf_counter()
+                get_or_compute('feed', self.compute, 60, version=version[0])
+                own.append(time.perf_counter() - started)
+                time.sleep(0.001)
+            latencies.extend(own)
+
+        threads = [threading.Thread(target=reader) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for _ in range(5):
+            time.sleep(COMPUTE_TIME * 2)
+            version[0] += 1
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99)]
+        self.assertLess(p99, COMPUTE_TIME / 2)
+        # Readers still holding the previous version may add one more.
+        self.assertLessEqual(self.calls, 2 * (1 + 5))
@@ -0,0 +1,61 @@
+import threading
+
+from django.test import SimpleTestCase, TestCase
+
+from core.metrics import Metrics, metrics
+
+
+class ServerTimingTest(TestCase):
+    def setUp(self):
+        metrics.clear()
+
+    def test_response_has_server_timing(self):
+        """Ответ содержит время SQL, шаблонов и кода."""
+        header = self.client.get('/about/author/')['Server-Timing']
+        for metric in ('db;dur=', 'tpl;dur=', 'app;dur=', 'total;dur='):
+            with self.subTest(metric=metric):
+                self.assertIn(metric, header)
+
+    def test_metrics_aggregate_views(self):
+        """/metrics отдает гистограммы и число запросов по view."""
+        self.client.get('/')
+        self.client.get('/')
+        self.client.get('/admin/login/')
+        text = self.client.get('/metrics').content.decode()
+        self.assertIn(
+            'yatube_request_duration_seconds_count{view="posts:index"} 2',
+            text
+        )
+        self.assertIn(
+            'yatube_request_duration_seconds_bucket{view="posts:index",'
+            'le="+Inf"} 2', text
+        )
+        self.assertIn('yatube_db_queries_total{view="posts:index"}', text)
+        self.assertNotIn('admin', text)
+
+    def test_template_time_counted(self):
+        """Время шаблонов попадает в Server-Timing."""
+        header = self.client.get('/about/author/')['Server-Timing']
+        template = header.split('tpl;dur=')[1].split(',')[0]
+        self.assertGreater(float(template), 0)
+
+    def test_metrics_closed_for_other_addresses(self):
+        """/metrics закрыт для чужих адресов."""
+        response = self.client.get('/metrics', REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response.status_code, 403)
+
+
+class MetricsShardsTest(SimpleTestCase):
+    def test_shards_of_finished_threads_are_merged(self):
+        """Шарды завершенных потоков сливаются, их число не растет."""
+        collected = Metrics()
+
+        def observe():
+            collected.observe('posts:index', 0.01, 0, 0, 1)
+
+        for _ in range(20):
+            thread = threading.Thread(target=observe)
+            thread.start()
+            thread.join()
+        self.assertEqual(len(collected.shards), 0)
+        self.assertEqual(collected.collect()['posts:index'].count, 20)
@@ -0,0 +1,13 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+from .metrics import metrics, render_metrics
+
+
+def metrics_view(request) -> HttpResponse:
+    """Request metrics of this process in Prometheus text format."""
+    allowed = getattr(settings, 'METRICS_ALLOWED_IPS', ('127.0.0.1',))
+    if request.META.get('REMOTE_ADDR') not in allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(metrics.collect()),
+                        content_type='text/plain; version=0.0.4')
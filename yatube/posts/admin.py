@@ -1,6 +1,76 @@
-from django.contrib import admin
+from functools import partial
+from typing import List, Optional, Tuple
 
-from .models import Post, Group
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.auth.admin import UserAdmin
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME, ActionForm
+from django.contrib.admin.views.main import ChangeList
+from django.template.response import TemplateResponse
+
+from .bulk import delete_posts, move_posts
+from .deletion import schedule_deletion
+from .models import PendingDeletion, Post, Group, User
+from .paginators import (FORWARD, CursorPaginator, EstimatedCountPaginator,
+                         decode_cursor, encode_cursor)
+from .search import is_search_available, search_posts
+
+
+CURSOR_VAR: str = 'cursor'
+CONFIRMATION_SAMPLE_SIZE: int = 20
+
+
+def get_group_choices(request) -> List[Tuple[str, str]]:
+    """Group choices built once per request for every changelist row."""
+    if not hasattr(request, '_group_choices'):
+        request._group_choices = [('', '---------')] + [
+            (pk, title) for pk, title in Group.objects.filter(
+                is_hidden=False
+            ).order_by('title').values_list('pk', 'title')
+        ]
+    return request._group_choices
+
+
+class PostChangeList(ChangeList):
+    """Changelist paging on by (pub_date, id) keyset with ?cursor=.
+
+    Numbered pages are still there, the "next" link skips OFFSET.
+    Searches are ordered by rank, they page by number only.
+    """
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None) -> str:
+        return super().get_query_string(new_params,
+                                        [*(remove or []), CURSOR_VAR])
+
+    def get_results(self, request) -> None:
+        super().get_results(request)
+        self.next_page_query: Optional[str] = None
+        if (self.show_all or not self.multi_page or self.query
+                or self.queryset.query.extra_order_by
+                or tuple(dict.fromkeys(self.queryset.query.order_by))
+                != CursorPaginator.ordering):
+            return
+        position = decode_cursor(request.GET.get(CURSOR_VAR, ''))
+        if position is not None and position[0] == FORWARD:
+            self.result_list = CursorPaginator(
+                self.queryset, self.list_per_page
+            ).get_cursor_queryset(*position)[:self.list_per_page]
+        posts: List[Post] = list(self.result_list)
+        if len(posts) == self.list_per_page:
+            cursor: str = encode_cursor(FORWARD, posts[-1].pub_date,
+                                        posts[-1].pk)
+            self.next_page_query = ChangeList.get_query_string(
+                self, {CURSOR_VAR: cursor}
+            )
+
+
+class PostActionForm(ActionForm):
+    group = forms.SlugField(required=False, label='Группа (slug)')
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -12,10 +82,120 @@ class PostAdmin(admin.ModelAdmin):
         'group',
     )
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
+    ordering = ('-pub_date', '-id')
+    raw_id_fields = ('author',)
+    autocomplete_fields = ('group',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    action_form = PostActionForm
+    actions = ('move_to_group', 'clear_group', 'delete_in_chunks')
+
+    def get_changelist(self, request, **kwargs):
+        return PostChangeList
+
+    def get_changelist_form(self, request, **kwargs):
+        kwargs.setdefault('formfield_callback',
+                          partial(self.changelist_formfield, request=request))
+        return super().get_changelist_form(request, **kwargs)
+
+    def changelist_formfield(self, db_field, request, **kwargs):
+        """Plain group select sharing cached choices between rows."""
+        if db_field.name != 'group':
+            return self.formfield_for_dbfield(db_field, request, **kwargs)
+        formfield = db_field.formfield(**kwargs)
+        formfield.choices = get_group_choices(request)
+        return formfield
+
+    def move_to_group(self, request, queryset) -> None:
+        slug: str = request.POST.get('group', '')
+        group: Optional[Group] = Group.objects.filter(
+            slug=slug, is_hidden=False
+        ).first()
+        if group is None:
+            self.message_user(request, f'Нет группы «{slug}».',
+                              messages.ERROR)
+            return
+        moved: int = move_posts(queryset, group)
+        self.message_user(request, f'Перенесено постов: {moved}.')
+    move_to_group.short_description = 'Перенести в группу'
+
+    def clear_group(self, request, queryset) -> None:
+        moved: int = move_posts(queryset, None)
+        self.message_user(request, f'Убрано из групп постов: {moved}.')
+    clear_group.short_description = 'Убрать из группы'
+
+    def delete_in_chunks(self, request,
+                         queryset) -> Optional[TemplateResponse]:
+        """Ask first like delete_selected, then delete_posts."""
+        if request.POST.get('post'):
+            deleted: int = delete_posts(queryset)
+            self.message_user(request, f'Удалено постов: {deleted}.')
+            return None
+        count: int = queryset.count()
+        sample: List[Post] = list(
+            queryset.select_related('author')[:CONFIRMATION_SAMPLE_SIZE]
+        )
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Удалить посты пачками?',
+            'opts': self.model._meta,
+            'count': count,
+            'sample': sample,
+            'rest': count - len(sample),
+            # Selection is passed on as is, select across included.
+            'selected': request.POST.getlist(ACTION_CHECKBOX_NAME),
+            'select_across': request.POST.get('select_across', '0'),
+            'action_checkbox_name': ACTION_CHECKBOX_NAME,
+            'media': self.media,
+        }
+        request.current_app = self.admin_site.name
+        return TemplateResponse(
+            request, 'admin/posts/post/delete_in_chunks_confirmation.html',
+            context
+        )
+    delete_in_chunks.allowed_permissions = ('delete',)
+    delete_in_chunks.short_description = 'Удалить пачками'
+
+    def get_search_results(self, request, queryset, search_term):
+        """Search text through FTS index instead of LIKE '%term%'."""
+        if not search_term or not is_search_available():
+            return super().get_search_results(request, queryset, search_term)
+        return search_posts(queryset, search_term), False
+
+
+class GroupAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'title', 'slug', 'posts_count', 'is_hidden')
+    search_fields = ('title', 'slug')
+
+    def delete_model(self, request, obj) -> None:
+        """Hide group, process_deletions unlinks posts and deletes it."""
+        schedule_deletion(obj)
+
+    def delete_queryset(self, request, queryset) -> None:
+        for group in queryset:
+            schedule_deletion(group)
+
+
+class DeferredDeletionUserAdmin(UserAdmin):
+    def delete_model(self, request, obj) -> None:
+        """Hide user, process_deletions removes posts and deletes it."""
+        schedule_deletion(obj)
+
+    def delete_queryset(self, request, queryset) -> None:
+        for user in queryset:
+            schedule_deletion(user)
+
+
+class PendingDeletionAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'object_id', 'created', 'posts_done')
 
 
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
+admin.site.register(Group, GroupAdmin)
+admin.site.register(PendingDeletion, PendingDeletionAdmin)
+admin.site.unregister(User)
+admin.site.register(User, DeferredDeletionUserAdmin)
@@ -0,0 +1,140 @@
+import json
+from typing import Dict, Iterator, List, Tuple
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models.query import QuerySet
+from django.http import HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_GET
+
+from .models import Group, Post, User
+from .paginators import (BACKWARD, FORWARD, CursorPaginator, decode_cursor,
+                         encode_cursor)
+from .views import POSTS_ON_PAGE
+
+
+API_FIELDS: Dict[str, str] = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'modified': 'modified',
+    'author': 'author__username',
+    'group': 'group__slug',
+}
+API_MAX_LIMIT: int = 100
+STREAM_CHUNK_SIZE: int = 1000
+
+
+def dumps(data) -> str:
+    """Compact JSON, dates in ISO 8601."""
+    return json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False,
+                      separators=(',', ':'))
+
+
+def get_fields(request) -> List[str]:
+    """Requested fields from ?fields=a,b, all of them by default."""
+    fields: List[str] = [
+        field for field in request.GET.get('fields', '').split(',')
+        if field in API_FIELDS
+    ]
+    return fields or list(API_FIELDS)
+
+
+def get_limit(request) -> int:
+    try:
+        limit: int = int(request.GET.get('limit', POSTS_ON_PAGE))
+    except ValueError:
+        return POSTS_ON_PAGE
+    return min(max(limit, 1), API_MAX_LIMIT)
+
+
+def get_rows(queryset: QuerySet, fields: List[str], limit: int) -> list:
+    """Plain rows, pub_date and id are always fetched for cursors."""
+    columns = {API_FIELDS[field] for field in fields} | {'id', 'pub_date'}
+    return list(queryset.values(*columns)[:limit])
+
+
+def serialize(row: dict, fields: List[str]) -> dict:
+    return {field: row[API_FIELDS[field]] for field in fields}
+
+
+def stream_feed(paginator: CursorPaginator,
+                fields: List[str]) -> Iterator[str]:
+    """Whole feed as JSON array, fetched by keyset in bounded chunks."""
+    yield '['
+    queryset: QuerySet = paginator.object_list
+    separator: str = ''
+    while True:
+        rows: list = get_rows(queryset, fields, STREAM_CHUNK_SIZE)
+        for row in rows:
+            yield separator + dumps(serialize(row, fields))
+            separator = ','
+        if len(rows) < STREAM_CHUNK_SIZE:
+            break
+        queryset = paginator.get_cursor_queryset(
+            FORWARD, rows[-1]['pub_date'], rows[-1]['id']
+        )
+    yield ']'
+
+
+def get_page_rows(paginator: CursorPaginator, cursor: str,
+                  fields: List[str], limit: int) -> Tuple[list, bool, bool]:
+    """Rows of cursor page with flags of next and previous pages."""
+    position = decode_cursor(cursor)
+    if position is None:
+        rows: list = get_rows(paginator.object_list, fields, limit + 1)
+        return rows[:limit], len(rows) > limit, False
+    rows = get_rows(paginator.get_cursor_queryset(*position), fields,
+                    limit + 1)
+    has_more: bool = len(rows) > limit
+    if position[0] == FORWARD:
+        return rows[:limit], has_more, True
+    return rows[:limit][::-1], True, has_more
+
+
+def feed_response(request, queryset: QuerySet) -> HttpResponse:
+    """One cursor page of feed, or the whole feed streamed with ?all=1."""
+    fields: List[str] = get_fields(request)
+    paginator: CursorPaginator = CursorPaginator(queryset, POSTS_ON_PAGE)
+    if request.GET.get('all') == '1':
+        return StreamingHttpResponse(stream_feed(paginator, fields),
+                                     content_type='application/json')
+    rows, has_next, has_previous = get_page_rows(
+        paginator, request.GET.get('cursor', ''), fields, get_limit(request)
+    )
+    data: dict = {
+        'results': [serialize(row, fields) for row in rows],
+        'next': None,
+        'previous': None,
+    }
+    if rows and has_next:
+        data['next'] = encode_cursor(FORWARD, rows[-1]['pub_date'],
+                                     rows[-1]['id'])
+    if rows and has_previous:
+        data['previous'] = encode_cursor(BACKWARD, rows[0]['pub_date'],
+                                         rows[0]['id'])
+    return HttpResponse(dumps(data), content_type='application/json')
+
+
+@require_GET
+def index(request) -> HttpResponse:
+    """JSON feed of all posts."""
+    return feed_response(request, Post.objects.visible())
+
+
+@require_GET
+def group_posts(request, slug: str) -> HttpResponse:
+    """JSON feed of group posts."""
+    group: Group = get_object_or_404(Group.objects.only('pk'), slug=slug,
+                                     is_hidden=False)
+    return feed_response(request,
+                         Post.objects.visible().filter(group_id=group.pk))
+
+
+@require_GET
+def profile(request, username: str) -> HttpResponse:
+    """JSON feed of author posts."""
+    author: User = get_object_or_404(User.objects.only('pk'),
+                                     username=username, is_active=True)
+    return feed_response(request,
+                         Post.objects.visible().filter(author_id=author.pk))
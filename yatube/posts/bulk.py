@@ -0,0 +1,133 @@
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Iterator, List, Optional
+
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.query import QuerySet
+from django.utils import timezone
+
+from .models import AuthorCounter, Group, Post, PostRow, TimelineEntry
+from .signals import invalidate_post_feeds
+from .timeline import fill_timeline
+
+
+BULK_CHUNK_SIZE: int = 1000
+
+# Called with the running total inside each chunk transaction.
+Progress = Optional[Callable[[int], None]]
+
+
+def filter_posts(author: Optional[str] = None, group: Optional[str] = None,
+                 since: Optional[date] = None,
+                 until: Optional[date] = None) -> QuerySet:
+    """Posts of author username and group slug within dates, inclusive."""
+    posts: QuerySet = Post.objects.all()
+    if author is not None:
+        posts = posts.filter(author__username=author)
+    if group is not None:
+        posts = posts.filter(group__slug=group)
+    if since is not None:
+        posts = posts.filter(pub_date__gte=timezone.make_aware(
+            datetime.combine(since, time.min)
+        ))
+    if until is not None:
+        posts = posts.filter(pub_date__lt=timezone.make_aware(
+            datetime.combine(until + timedelta(days=1), time.min)
+        ))
+    return posts
+
+
+def chunk_ids(queryset: QuerySet, chunk_size: int) -> Iterator[List[int]]:
+    """Primary keys of queryset in chunks, walked by keyset on pk.
+
+    Each chunk is read afresh, so rows changed by earlier chunks are
+    never skipped nor seen twice.
+    """
+    queryset = queryset.order_by('pk').values_list('pk', flat=True)
+    last_pk: int = 0
+    while True:
+        ids: List[int] = list(queryset.filter(pk__gt=last_pk)[:chunk_size])
+        if not ids:
+            return
+        yield ids
+        last_pk = ids[-1]
+
+
+def get_chunk_counts(ids: List[int]) -> list:
+    return list(Post.objects.filter(pk__in=ids).order_by().values(
+        'author_id', 'group_id'
+    ).annotate(total=Count('pk')))
+
+
+def move_posts(queryset: QuerySet, group: Optional[Group],
+               chunk_size: int = BULK_CHUNK_SIZE,
+               progress: Progress = None) -> int:
+    """Move posts into group, or out of any with None, chunk by chunk."""
+    group_id: Optional[int] = group.pk if group else None
+    moved: int = 0
+    for ids in chunk_ids(queryset, chunk_size):
+        with transaction.atomic():
+            counts: list = get_chunk_counts(ids)
+            Post.objects.filter(pk__in=ids).update(
+                group_id=group_id, modified=timezone.now()
+            )
+            TimelineEntry.objects.filter(pk__in=ids).update(
+                group_id=group_id,
+                group_slug=group.slug if group else '',
+                group_title=group.title if group else '',
+            )
+            for row in counts:
+                Group.change_posts_count(row['group_id'], -row['total'])
+                Group.change_posts_count(group_id, row['total'])
+            moved += len(ids)
+            if progress:
+                progress(moved)
+        invalidate_post_feeds(
+            {row['author_id'] for row in counts},
+            {row['group_id'] for row in counts} | {group_id},
+            ids,
+        )
+    return moved
+
+
+def get_post_references() -> List[str]:
+    """Relations to posts besides timeline, a plain DELETE would break."""
+    return [
+        relation.related_model._meta.label
+        for relation in Post._meta.related_objects
+        if relation.related_model is not TimelineEntry
+    ]
+
+
+def delete_posts(queryset: QuerySet, chunk_size: int = BULK_CHUNK_SIZE,
+                 progress: Progress = None) -> int:
+    """Delete posts chunk by chunk with one DELETE per chunk.
+
+    Rows go through PostRow, which has no signals nor relations, so
+    delete() needs no collector. Counters, timeline and feeds are fixed
+    once per chunk instead.
+    """
+    references: List[str] = get_post_references()
+    if references:
+        raise RuntimeError(f'Posts are referred to by {", ".join(references)}'
+                           f', delete them through Post.delete().')
+    deleted: int = 0
+    for ids in chunk_ids(queryset, chunk_size):
+        with transaction.atomic():
+            counts: list = get_chunk_counts(ids)
+            TimelineEntry.objects.filter(pk__in=ids).delete()
+            PostRow.objects.filter(pk__in=ids).delete()
+            for row in counts:
+                AuthorCounter.change_posts_count(row['author_id'],
+                                                 -row['total'])
+                Group.change_posts_count(row['group_id'], -row['total'])
+            fill_timeline()
+            deleted += len(ids)
+            if progress:
+                progress(deleted)
+        invalidate_post_feeds(
+            {row['author_id'] for row in counts},
+            {row['group_id'] for row in counts},
+            ids,
+        )
+    return deleted
@@ -0,0 +1,127 @@
+import hashlib
+import time
+from typing import Callable, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+FEED_GENERATION_KEY: str = 'feed-generation:{feed}'
+FEED_PAGE_KEY: str = 'feed-page:{feed}:{page}'
+
+FEED_CACHE_PAGES: int = getattr(settings, 'FEED_CACHE_PAGES', 3)
+FEED_CACHE_TIMEOUT: int = getattr(settings, 'FEED_CACHE_TIMEOUT', 60 * 15)
+# Proxies never learn of new generations, so they keep pages briefly.
+PAGE_CACHE_MAX_AGE: int = getattr(settings, 'PAGE_CACHE_MAX_AGE', 60)
+PRIVATE_COOKIES = (settings.SESSION_COOKIE_NAME, 'messages')
+
+
+def index_feed() -> str:
+    return 'index'
+
+
+def group_feed(slug: str) -> str:
+    return f'group:{slug}'
+
+
+def profile_feed(username: str) -> str:
+    return f'profile:{username}'
+
+
+def post_feed(post_id: int) -> str:
+    return f'post:{post_id}'
+
+
+def make_feed_key(template: str, feed: str, **kwargs) -> str:
+    """Cache key safe for any backend, slugs may hold non-ascii."""
+    feed = hashlib.md5(feed.encode()).hexdigest()
+    return template.format(feed=feed, **kwargs)
+
+
+def get_feed_generation(feed: str) -> int:
+    """Current generation of feed, cached pages of older ones are dead."""
+    key: str = make_feed_key(FEED_GENERATION_KEY, feed)
+    generation: Optional[int] = cache.get(key)
+    if generation is None:
+        # Evicted counter must never restart from an already used value.
+        generation = time.time_ns()
+        cache.add(key, generation, timeout=None)
+        generation = cache.get(key, generation)
+    return generation
+
+
+def forget_feeds(feeds: Iterable[str]) -> None:
+    """Drop generations of feeds without object behind them.
+
+    Safe at any time: the next generation never repeats a used one.
+    """
+    cache.delete_many([make_feed_key(FEED_GENERATION_KEY, feed)
+                       for feed in feeds])
+
+
+def bump_feeds(feeds) -> None:
+    for feed in feeds:
+        key: str = make_feed_key(FEED_GENERATION_KEY, feed)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+def invalidate_feeds(*feeds: str) -> None:
+    """Bump generations, so all cached pages of feeds are dropped.
+
+    Feeds are bumped again once the current transaction commits: a
+    reader may cache pre-commit content under the first bump, the
+    second one drops it.
+    """
+    feeds = set(feeds)
+    bump_feeds(feeds)
+    transaction.on_commit(lambda: bump_feeds(feeds))
+
+
+def has_private_state(request) -> bool:
+    """Request carries session or messages, page may be personal."""
+    return any(name in request.COOKIES for name in PRIVATE_COOKIES)
+
+
+def get_cached_page_number(request) -> Optional[int]:
+    """Number of page worth caching for anonymous request, else None."""
+    if request.method not in ('GET', 'HEAD') or has_private_state(request):
+        return None
+    if set(request.GET) - {'page'}:
+        return None
+    page: str = request.GET.get('page', '1')
+    if not page.isdigit() or not 1 <= int(page) <= FEED_CACHE_PAGES:
+        return None
+    return int(page)
+
+
+def cache_feed_page(feed_key: Callable[..., str],
+                    related_feeds: Optional[
+                        Callable[..., Iterable[str]]] = None):
+    """Mark view for AnonymousPageCacheMiddleware.
+
+    feed_key builds the feed name from view kwargs, it must match
+    the names invalidated from posts.signals. related_feeds lists other
+    feeds shown on the page, it is cached under generations of all.
+    """
+    def decorator(view):
+        view.page_cache_feed = feed_key
+        view.page_cache_related_feeds = related_feeds
+        return view
+    return decorator
+
+
+def make_etag(request, *parts) -> str:
+    """ETag of parts for viewer, pages differ for every logged in user."""
+    viewer = request.user.pk if request.user.is_authenticated else 'anon'
+    return '-'.join(str(part) for part in (*parts, viewer))
+
+
+def feed_etag(feed_key: Callable[..., str]):
+    """etag_func for condition(), changes with generation of feed."""
+    def etag(request, *args, **kwargs) -> str:
+        return make_etag(request, get_feed_generation(feed_key(**kwargs)))
+    return etag
@@ -0,0 +1,22 @@
+from typing import List
+
+from django.core.checks import Tags, Warning, register
+from django.db import connection
+
+from .search import get_missing_triggers, is_search_available
+
+
+@register(Tags.database)
+def check_search_triggers(app_configs, **kwargs) -> List[Warning]:
+    """Tables remade by SQLite migrations silently lose their triggers."""
+    if not is_search_available(connection):
+        return []
+    missing: List[str] = get_missing_triggers(connection)
+    if not missing:
+        return []
+    return [Warning(
+        f'Search triggers missing: {", ".join(missing)}.',
+        hint='Run manage.py rebuild_search_index.',
+        obj='posts_post',
+        id='posts.W001',
+    )]
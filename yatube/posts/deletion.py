@@ -0,0 +1,71 @@
+from typing import Union
+
+from django.db import transaction
+
+from core.auth import forget_user
+
+from .bulk import BULK_CHUNK_SIZE, Progress, delete_posts, move_posts
+from .models import Group, PendingDeletion, Post, User
+from .signals import invalidate_author_feeds, invalidate_group_feeds
+from .timeline import hide_posts, push_new_posts
+
+
+def schedule_deletion(instance: Union[User, Group]) -> PendingDeletion:
+    """Hide user or group at once, its posts go later in batches.
+
+    Hidden user can not log in and has no profile, hidden group has
+    no page and can not be picked for new posts. Posts of either drop
+    out of feeds, search and API through PostQuerySet.visible().
+    """
+    with transaction.atomic():
+        if isinstance(instance, Group):
+            kind: str = PendingDeletion.GROUP
+            Group.objects.filter(pk=instance.pk).update(is_hidden=True)
+            hide_posts(group_id=instance.pk)
+            invalidate_group_feeds(instance)
+        else:
+            kind = PendingDeletion.USER
+            User.objects.filter(pk=instance.pk).update(is_active=False)
+            # update() sends no post_save, cached request.user goes here.
+            forget_user(instance.pk)
+            hide_posts(author_id=instance.pk)
+            invalidate_author_feeds(instance.pk, instance.username)
+        deletion, _ = PendingDeletion.objects.get_or_create(
+            kind=kind, object_id=instance.pk
+        )
+    return deletion
+
+
+def process_deletion(deletion: PendingDeletion,
+                     chunk_size: int = BULK_CHUNK_SIZE,
+                     progress: Progress = None) -> None:
+    """Null or remove posts of deletion chunk by chunk, then the owner.
+
+    Every chunk is committed along with posts_done, bulk helpers call
+    progress inside the chunk transaction, so interrupted run goes on
+    from where it stopped.
+    """
+    started_at: int = deletion.posts_done
+
+    def save_progress(done: int) -> None:
+        deletion.posts_done = started_at + done
+        deletion.save(update_fields=('posts_done',))
+        if progress:
+            progress(deletion.posts_done)
+
+    if deletion.kind == PendingDeletion.GROUP:
+        move_posts(Post.objects.filter(group_id=deletion.object_id), None,
+                   chunk_size, save_progress)
+        owners = Group.objects.filter(pk=deletion.object_id)
+    else:
+        delete_posts(Post.objects.filter(author_id=deletion.object_id),
+                     chunk_size, save_progress)
+        owners = User.objects.filter(pk=deletion.object_id)
+    with transaction.atomic():
+        # Nothing is left to cascade, delete() only tidies up the rest.
+        for owner in owners:
+            owner.delete()
+        deletion.delete()
+        if deletion.kind == PendingDeletion.GROUP:
+            # Posts left the hidden group and are shown again.
+            push_new_posts()
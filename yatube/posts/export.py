@@ -0,0 +1,108 @@
+import csv
+import zlib
+from typing import Iterable, Iterator, List, Optional
+
+from django.contrib.auth.decorators import login_required
+from django.db.models.query import QuerySet
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_GET
+
+from .api import API_FIELDS, dumps
+from .models import Group, Post, User
+
+
+EXPORT_FORMATS = ('jsonl', 'csv')
+EXPORT_CHUNK_SIZE: int = 2000
+CONTENT_TYPES = {'jsonl': 'application/x-ndjson', 'csv': 'text/csv'}
+
+
+class Echo:
+    """File-like object handing written line back to csv.writer caller."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def get_export_queryset(author: Optional[str] = None,
+                        group: Optional[str] = None) -> QuerySet:
+    """Posts of author, group or all of them, oldest first."""
+    queryset: QuerySet = Post.objects.order_by('pk')
+    if author is not None:
+        queryset = queryset.filter(author_id=get_object_or_404(
+            User.objects.only('pk'), username=author
+        ).pk)
+    if group is not None:
+        queryset = queryset.filter(group_id=get_object_or_404(
+            Group.objects.only('pk'), slug=group
+        ).pk)
+    return queryset
+
+
+def export_rows(queryset: QuerySet,
+                chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[tuple]:
+    """Rows fetched in chunks, memory does not grow with export size."""
+    return queryset.values_list(*API_FIELDS.values()).iterator(
+        chunk_size=chunk_size
+    )
+
+
+def render_jsonl(rows: Iterable[tuple]) -> Iterator[str]:
+    fields: List[str] = list(API_FIELDS)
+    for row in rows:
+        yield dumps(dict(zip(fields, row))) + '\n'
+
+
+def render_csv(rows: Iterable[tuple]) -> Iterator[str]:
+    writer = csv.writer(Echo())
+    yield writer.writerow(list(API_FIELDS))
+    for row in rows:
+        yield writer.writerow(row)
+
+
+RENDERERS = {'jsonl': render_jsonl, 'csv': render_csv}
+
+
+def encode(lines: Iterable[str], compress: bool = False) -> Iterator[bytes]:
+    """UTF-8 bytes of lines, gzipped on the fly if asked."""
+    if not compress:
+        for line in lines:
+            yield line.encode()
+        return
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for line in lines:
+        data: bytes = compressor.compress(line.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_posts(queryset: QuerySet, file_format: str = 'jsonl',
+                 compress: bool = False,
+                 chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[bytes]:
+    return encode(
+        RENDERERS[file_format](export_rows(queryset, chunk_size)), compress
+    )
+
+
+@require_GET
+@login_required
+def download(request) -> StreamingHttpResponse:
+    """Posts of ?author= or ?group=, or all posts, as file download."""
+    file_format: str = request.GET.get('format', 'jsonl')
+    if file_format not in EXPORT_FORMATS:
+        return HttpResponseBadRequest('Unknown format.')
+    compress: bool = request.GET.get('gzip') == '1'
+    queryset: QuerySet = get_export_queryset(
+        request.GET.get('author'), request.GET.get('group')
+    ).visible()
+    filename: str = f'posts.{file_format}'
+    response = StreamingHttpResponse(
+        export_posts(queryset, file_format, compress),
+        content_type=CONTENT_TYPES[file_format]
+    )
+    if compress:
+        filename += '.gz'
+        response['Content-Type'] = 'application/gzip'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -1,6 +1,6 @@
 from django import forms
 
-from .models import Post
+from .models import Group, Post
 
 
 class PostForm(forms.ModelForm):
@@ -11,3 +11,13 @@ class PostForm(forms.ModelForm):
             'text': 'Текст',
             'group': 'Группа'
         }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['group'].queryset = Group.objects.filter(is_hidden=False)
+
+
+class SearchForm(forms.Form):
+    q = forms.CharField(label='Поиск', max_length=200)
+    group = forms.SlugField(label='Группа', required=False)
+    author = forms.CharField(label='Автор', max_length=150, required=False)
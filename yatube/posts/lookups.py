@@ -0,0 +1,104 @@
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import models
+from django.db.models.query import QuerySet
+from django.http import Http404
+
+from core.cache import TwoTierCache
+
+from .cache import (get_feed_generation, group_feed, make_feed_key,
+                    post_feed, profile_feed)
+from .models import Group, Post, User
+
+
+OBJECT_KEY: str = 'object:{feed}'
+NOT_FOUND: str = 'not-found'
+
+OBJECT_CACHE_TIMEOUT: int = getattr(settings, 'OBJECT_CACHE_TIMEOUT',
+                                    60 * 15)
+OBJECT_CACHE_MISS_TIMEOUT: int = getattr(settings,
+                                         'OBJECT_CACHE_MISS_TIMEOUT', 30)
+
+
+class ObjectCache:
+    """Objects of queryset by unique field in TwoTierCache.
+
+    Entries carry generation of the feed object shows up in, so
+    changes done with update(), counters included, drop them as well.
+    Objects cached along with relations also carry generations of
+    related_feeds, renames and hiding of relations drop them too.
+    Saved objects are written through once committed, missing ones are
+    remembered for OBJECT_CACHE_MISS_TIMEOUT without version: random
+    values must not leave feed generations behind.
+    """
+
+    def __init__(self, queryset: QuerySet, field: str,
+                 feed_key: Callable[[Any], str],
+                 related_feeds: Optional[
+                     Callable[[models.Model], Iterable[str]]] = None):
+        self.queryset = queryset
+        self.field = field
+        self.feed_key = feed_key
+        self.related_feeds = related_feeds
+        self.cache = TwoTierCache(timeout=OBJECT_CACHE_TIMEOUT)
+
+    def make_key(self, value) -> str:
+        return make_feed_key(
+            OBJECT_KEY, f'{self.queryset.model._meta.label}:{value}'
+        )
+
+    def get_version(self, value, instance: Optional[models.Model] = None
+                    ) -> Tuple[int, ...]:
+        feeds: List[str] = [self.feed_key(value)]
+        if instance is not None and self.related_feeds is not None:
+            feeds.extend(self.related_feeds(instance))
+        return tuple(get_feed_generation(feed) for feed in feeds)
+
+    def get(self, value) -> Optional[models.Model]:
+        key: str = self.make_key(value)
+        entry: Optional[tuple] = self.cache.get(key)
+        if entry is not None:
+            if entry[1] == NOT_FOUND:
+                return None
+            if entry[0] == self.get_version(value, entry[1]):
+                return entry[1]
+        instance = self.queryset.filter(**{self.field: value}).first()
+        if instance is None:
+            self.cache.set(key, (None, NOT_FOUND), OBJECT_CACHE_MISS_TIMEOUT)
+        else:
+            self.set(instance)
+        return instance
+
+    def get_or_404(self, value, **conditions) -> models.Model:
+        """Object by value matching conditions, like get_object_or_404."""
+        instance: Optional[models.Model] = self.get(value)
+        if instance is None or any(
+                getattr(instance, name) != expected
+                for name, expected in conditions.items()):
+            raise Http404(f'No {self.queryset.model._meta.object_name} '
+                          f'matches the given query.')
+        return instance
+
+    def set(self, instance: models.Model) -> None:
+        value = getattr(instance, self.field)
+        self.cache.set(self.make_key(value),
+                       (self.get_version(value, instance), instance))
+
+    def delete(self, value) -> None:
+        self.cache.delete(self.make_key(value))
+
+
+def get_post_related_feeds(post: Post) -> List[str]:
+    """Feeds of author and group, which the post is cached along with."""
+    feeds: List[str] = [profile_feed(post.author.username)]
+    if post.group is not None:
+        feeds.append(group_feed(post.group.slug))
+    return feeds
+
+
+posts = ObjectCache(Post.objects.select_related('group', 'author'), 'pk',
+                    post_feed, get_post_related_feeds)
+groups = ObjectCache(Group.objects.all(), 'slug', group_feed)
+users = ObjectCache(User.objects.select_related('posts_counter'),
+                    'username', profile_feed)
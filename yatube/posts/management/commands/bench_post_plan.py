@@ -0,0 +1,76 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.test.utils import override_settings
+
+from posts.models import Group, Post, User
+from posts.paginators import CursorPaginator
+from posts.views import POSTS_ON_PAGE
+
+
+BENCH_CACHES: dict = {
+    **settings.CACHES,
+    'template_fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'bench_post_plan',
+    },
+}
+
+
+class Command(BaseCommand):
+    help = ('Compare rendering time of index page with cold and warm '
+            'post card fragment cache. Data is rolled back afterwards.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200)
+
+    def handle(self, *args, **options):
+        with transaction.atomic(), override_settings(CACHES=BENCH_CACHES):
+            author = User.objects.create_user(
+                username='bench_post_plan', first_name='Лев',
+                last_name='Толстой'
+            )
+            group = Group.objects.create(
+                title='Бенчмарк', slug='bench-post-plan'
+            )
+            Post.objects.bulk_create(
+                Post(text=f'Текст поста {i} ' * 20, author=author,
+                     group=group)
+                for i in range(POSTS_ON_PAGE)
+            )
+            page_obj = CursorPaginator(
+                author.posts.select_related('author', 'group'),
+                POSTS_ON_PAGE
+            ).get_page(1)
+            list(page_obj)
+            request = RequestFactory().get('/')
+            request.user = AnonymousUser()
+            fragments = caches['template_fragments']
+            cold = self.measure(options['iterations'], request, page_obj,
+                                before=fragments.clear)
+            warm = self.measure(options['iterations'], request, page_obj)
+            transaction.set_rollback(True)
+        self.stdout.write(
+            f'{POSTS_ON_PAGE} posts, median of {options["iterations"]} '
+            f'renders: cold {cold:.2f} ms, warm {warm:.2f} ms, '
+            f'{100 * (cold - warm) / cold:.0f}% less template time.'
+        )
+
+    def measure(self, iterations, request, page_obj, before=None) -> float:
+        """Median rendering time of index page in milliseconds."""
+        timings = []
+        for _ in range(iterations):
+            if before is not None:
+                before()
+            started = time.perf_counter()
+            render_to_string('posts/index.html', {'page_obj': page_obj},
+                             request=request)
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
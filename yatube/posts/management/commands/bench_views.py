@@ -0,0 +1,161 @@
+import json
+import math
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, models, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import AuthorCounter, Group, Post
+
+
+PERCENTILES: tuple = (50, 95, 99)
+
+
+def percentile(values: list, rank: int) -> float:
+    """Nearest-rank percentile of values."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(rank / 100 * len(ordered)) - 1, 0)]
+
+
+class Command(BaseCommand):
+    help = ('Drive posts views through test client and report latency '
+            'percentiles and query counts. Writes are rolled back.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Requests per view.')
+        parser.add_argument('--baseline', default='bench_views.json',
+                            help='JSON file with results to compare to.')
+        parser.add_argument('--save-baseline', action='store_true',
+                            help='Store this run as the new baseline.')
+        parser.add_argument('--anonymous', action='store_true',
+                            help='Read feeds as logged out user.')
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        with transaction.atomic():
+            author = self.get_author()
+            reader = Client()
+            writer = Client()
+            writer.force_login(author)
+            if not options['anonymous']:
+                reader = writer
+            results = {
+                view: self.measure(client, request, options['requests'])
+                for view, client, request in self.get_scenarios(
+                    author, reader, writer
+                )
+            }
+            transaction.set_rollback(True)
+        baseline = self.load_baseline(options['baseline'])
+        self.report(results, baseline)
+        if options['save_baseline']:
+            with open(options['baseline'], 'w') as baseline_file:
+                json.dump(results, baseline_file, indent=2, sort_keys=True)
+            self.stdout.write(f'Baseline saved to {options["baseline"]}')
+
+    def get_author(self):
+        counter = AuthorCounter.objects.select_related('user').order_by(
+            '-posts_count'
+        ).first()
+        if counter is None:
+            raise CommandError('No posts, run generate_data first.')
+        return counter.user
+
+    def get_scenarios(self, author, reader, writer) -> list:
+        """Triples of view name, client and request factory."""
+        slugs = list(Group.objects.order_by('-posts_count').values_list(
+            'slug', flat=True
+        )[:100])
+        usernames = list(AuthorCounter.objects.order_by(
+            '-posts_count'
+        ).values_list('user__username', flat=True)[:100])
+        last_id = Post.objects.aggregate(last=models.Max('pk'))['last']
+        post_ids = list(Post.objects.filter(pk__in=[
+            self.random.randint(1, last_id) for _ in range(1000)
+        ]).values_list('pk', flat=True))
+        own_post_ids = list(author.posts.values_list('pk', flat=True)[:100])
+
+        def page():
+            return {'page': self.random.randint(1, 10)}
+
+        def index():
+            return 'get', reverse('posts:index'), page()
+
+        def group_posts():
+            slug = self.random.choice(slugs)
+            return 'get', reverse('posts:group_list', args=[slug]), page()
+
+        def profile():
+            username = self.random.choice(usernames)
+            return 'get', reverse('posts:profile', args=[username]), page()
+
+        def post_detail():
+            post_id = self.random.choice(post_ids)
+            return 'get', reverse('posts:post_detail', args=[post_id]), {}
+
+        def post_create():
+            return 'post', reverse('posts:post_create'), {
+                'text': 'Бенчмарк', 'group': ''
+            }
+
+        def post_edit():
+            post_id = self.random.choice(own_post_ids)
+            return 'post', reverse('posts:post_edit', args=[post_id]), {
+                'text': f'Бенчмарк {self.random.random()}', 'group': ''
+            }
+
+        scenarios = [
+            ('index', reader, index),
+            ('profile', reader, profile),
+            ('post_detail', reader, post_detail),
+            ('post_create', writer, post_create),
+            ('post_edit', writer, post_edit),
+        ]
+        if slugs:
+            scenarios.insert(1, ('group_posts', reader, group_posts))
+        return scenarios
+
+    def measure(self, client, make_request, requests: int) -> dict:
+        timings, queries = [], []
+        for _ in range(requests):
+            method, url, data = make_request()
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = getattr(client, method)(url, data)
+                timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                raise CommandError(f'{url} answered {response.status_code}')
+            queries.append(len(captured))
+        result = {f'p{rank}': round(percentile(timings, rank), 3)
+                  for rank in PERCENTILES}
+        result['queries'] = max(queries)
+        return result
+
+    def load_baseline(self, path: str) -> dict:
+        try:
+            with open(path) as baseline_file:
+                return json.load(baseline_file)
+        except FileNotFoundError:
+            return {}
+
+    def report(self, results: dict, baseline: dict) -> None:
+        columns = [f'p{rank}' for rank in PERCENTILES] + ['queries']
+        self.stdout.write(
+            f'{"view":<12}' + ''.join(f'{column:>20}' for column in columns)
+        )
+        for view, result in results.items():
+            cells = []
+            for column in columns:
+                cell = f'{result[column]:g}'
+                previous = baseline.get(view, {}).get(column)
+                if previous:
+                    cell += f' ({100 * (result[column] / previous - 1):+.0f}%)'
+                cells.append(f'{cell:>20}')
+            self.stdout.write(f'{view:<12}' + ''.join(cells))
+        self.stdout.write('Latency in ms, queries is the max per request.')
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.bulk import delete_posts, filter_posts
+from .move_posts import add_filter_arguments, progress
+
+
+class Command(BaseCommand):
+    help = 'Delete posts picked by author, group and dates in chunks.'
+
+    def add_arguments(self, parser):
+        add_filter_arguments(parser)
+
+    def handle(self, *args, **options):
+        filters = [options[name] for name in
+                   ('author', 'group', 'since', 'until')]
+        if all(value is None for value in filters):
+            raise CommandError('Give at least one of --author, --group, '
+                               '--since or --until.')
+        started = time.perf_counter()
+        deleted = delete_posts(filter_posts(*filters), options['chunk_size'],
+                               progress(self, started, 'deleted'))
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} posts.'))
@@ -0,0 +1,47 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.http import Http404
+
+from posts.export import (EXPORT_CHUNK_SIZE, EXPORT_FORMATS, export_posts,
+                          get_export_queryset)
+
+
+class Command(BaseCommand):
+    help = ('Export posts of author, group or all of them as JSONL or CSV, '
+            'streamed in chunks.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--author', help='Username.')
+        parser.add_argument('--group', help='Group slug.')
+        parser.add_argument('--format', choices=EXPORT_FORMATS,
+                            default='jsonl')
+        parser.add_argument('--gzip', action='store_true')
+        parser.add_argument('--chunk-size', type=int,
+                            default=EXPORT_CHUNK_SIZE)
+        parser.add_argument('--output', default='-',
+                            help='File to write, - for stdout.')
+
+    def handle(self, *args, **options):
+        try:
+            queryset = get_export_queryset(options['author'],
+                                           options['group'])
+        except Http404:
+            raise CommandError('Author or group not found.')
+        started = time.perf_counter()
+        output = (sys.stdout.buffer if options['output'] == '-'
+                  else open(options['output'], 'wb'))
+        written: int = 0
+        try:
+            for data in export_posts(queryset, options['format'],
+                                     options['gzip'], options['chunk_size']):
+                output.write(data)
+                written += len(data)
+        finally:
+            if output is not sys.stdout.buffer:
+                output.close()
+        self.stderr.write(
+            f'Exported {written} bytes in '
+            f'{time.perf_counter() - started:.1f} s.'
+        )
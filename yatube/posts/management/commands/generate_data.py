@@ -0,0 +1,144 @@
+import itertools
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import models, transaction
+from django.utils import timezone
+from faker import Faker
+
+from posts.cache import index_feed, invalidate_feeds
+from posts.models import Group, PostRow, User
+
+
+def zipf_weights(size: int, exponent: float) -> list:
+    """Cumulative weights where rank k is picked ~ 1 / k ** exponent."""
+    return list(itertools.accumulate(
+        1 / rank ** exponent for rank in range(1, size + 1)
+    ))
+
+
+class Command(BaseCommand):
+    help = ('Fill database with synthetic users, groups and posts. '
+            'Authors and groups follow skewed (Zipf) popularity.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--groups', type=int, default=1000)
+        parser.add_argument('--posts', type=int, default=1000000)
+        parser.add_argument('--days', type=int, default=3 * 365,
+                            help='Posts are spread over this many days.')
+        parser.add_argument('--skew', type=float, default=1.1,
+                            help='Zipf exponent of authors and groups.')
+        parser.add_argument('--no-group-share', type=float, default=0.3,
+                            help='Share of posts without group.')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.fake = Faker('ru_RU')
+        self.fake.seed_instance(options['seed'])
+        self.batch_size = options['batch_size']
+        started = time.perf_counter()
+
+        user_ids = self.create_users(options['users'])
+        group_ids = self.create_groups(options['groups'])
+        self.create_posts(options, user_ids, group_ids)
+        # Generator bypasses PostQuerySet.bulk_create, fix counters at once.
+        call_command('recount_posts', stdout=self.stdout)
+        call_command('rebuild_timeline', stdout=self.stdout)
+        invalidate_feeds(index_feed())
+        self.stdout.write(self.style.SUCCESS(
+            f'Done in {time.perf_counter() - started:.1f} s.'
+        ))
+
+    def insert(self, model, objects) -> None:
+        """Insert objects in batches, one transaction per batch."""
+        queryset = models.QuerySet(model)
+        while True:
+            batch = list(itertools.islice(objects, self.batch_size))
+            if not batch:
+                return
+            with transaction.atomic():
+                queryset.bulk_create(batch)
+
+    def create_users(self, count: int) -> list:
+        first_id = (User.objects.aggregate(last=models.Max('pk'))['last']
+                    or 0) + 1
+        password = make_password(None)
+        now = timezone.now()
+        self.insert(User, (
+            User(username=f'{self.fake.user_name()}_{first_id + i}',
+                 first_name=self.fake.first_name(),
+                 last_name=self.fake.last_name(),
+                 password=password,
+                 date_joined=now)
+            for i in range(count)
+        ))
+        self.stdout.write(f'Users: {count}')
+        return list(User.objects.filter(
+            pk__gte=first_id
+        ).values_list('pk', flat=True))
+
+    def create_groups(self, count: int) -> list:
+        first_id = (Group.objects.aggregate(last=models.Max('pk'))['last']
+                    or 0) + 1
+        self.insert(Group, (
+            Group(title=self.fake.sentence(nb_words=3)[:200],
+                  slug=f'group-{first_id + i}',
+                  description=self.fake.paragraph())
+            for i in range(count)
+        ))
+        self.stdout.write(f'Groups: {count}')
+        return list(Group.objects.filter(
+            pk__gte=first_id
+        ).values_list('pk', flat=True))
+
+    def create_posts(self, options: dict, user_ids: list,
+                     group_ids: list) -> None:
+        count: int = options['posts']
+        if not count or not user_ids:
+            return
+        # Faker is slow for millions of rows, texts are built from a pool.
+        sentences = [self.fake.sentence() for _ in range(1000)]
+        author_weights = zipf_weights(len(user_ids), options['skew'])
+        group_weights = zipf_weights(len(group_ids), options['skew'])
+        self.random.shuffle(user_ids)
+        self.random.shuffle(group_ids)
+        now = timezone.now()
+        period: float = timedelta(days=options['days']).total_seconds()
+
+        def posts():
+            for _ in range(count):
+                group_id = None
+                if (group_ids
+                        and self.random.random() >= options[
+                            'no_group_share']):
+                    group_id = self.random.choices(
+                        group_ids, cum_weights=group_weights
+                    )[0]
+                pub_date = now - timedelta(
+                    seconds=self.random.random() * period
+                )
+                yield PostRow(
+                    text=' '.join(self.random.choices(
+                        sentences, k=self.random.randint(1, 12)
+                    )),
+                    author_id=self.random.choices(
+                        user_ids, cum_weights=author_weights
+                    )[0],
+                    group_id=group_id,
+                    pub_date=pub_date,
+                    modified=pub_date,
+                )
+
+        started = time.perf_counter()
+        self.insert(PostRow, posts())
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'Posts: {count} ({count / elapsed:.0f} rows/s)'
+        )
@@ -0,0 +1,191 @@
+import csv
+import itertools
+import json
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts.models import Group, PostRow, User
+from posts.signals import invalidate_post_feeds
+
+
+FORMATS = ('jsonl', 'csv')
+KEY_FIELDS = ('text', 'author', 'group', 'pub_date')
+
+Row = Tuple[int, object]
+
+
+class LookupCache:
+    """Ids of model by natural key, missing keys fetched in one query."""
+
+    def __init__(self, queryset, field: str):
+        self.queryset = queryset
+        self.field = field
+        self.ids: Dict[str, Optional[int]] = {}
+
+    def load(self, keys) -> None:
+        missing = {key for key in keys if key and key not in self.ids}
+        if not missing:
+            return
+        self.ids.update(dict.fromkeys(missing))
+        self.ids.update(self.queryset.filter(
+            **{f'{self.field}__in': missing}
+        ).values_list(self.field, 'pk'))
+
+    def get(self, key: str) -> Optional[int]:
+        return self.ids.get(key)
+
+
+class Command(BaseCommand):
+    help = ('Import posts from JSONL or CSV file with fields text, author '
+            '(username), group (slug, optional) and pub_date (optional). '
+            'Rows of unknown authors or groups are skipped, malformed '
+            'rows are reported and skipped.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import, - for stdin.')
+        parser.add_argument('--format', choices=FORMATS, default=None,
+                            help='Taken from file extension by default.')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Posts in one INSERT.')
+        parser.add_argument('--transaction-size', type=int, default=10000,
+                            help='Posts committed in one transaction.')
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or self.guess_format(options['path'])
+        self.batch_size: int = options['batch_size']
+        self.authors = LookupCache(User.objects.all(), 'username')
+        self.groups = LookupCache(Group.objects.all(), 'slug')
+        self.author_ids: Set[int] = set()
+        self.group_ids: Set[Optional[int]] = set()
+        self.imported = self.skipped = 0
+        self.started = time.perf_counter()
+
+        source = (sys.stdin if options['path'] == '-'
+                  else open(options['path'], encoding='utf-8', newline=''))
+        try:
+            rows = self.read(source, file_format)
+            while self.import_chunk(rows, options['transaction_size']):
+                self.report()
+        finally:
+            if source is not sys.stdin:
+                source.close()
+            if self.imported:
+                self.finish()
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {self.imported} posts, skipped {self.skipped} '
+            f'({self.get_rate():.0f} rows/s).'
+        ))
+
+    def guess_format(self, path: str) -> str:
+        extension: str = path.rsplit('.', 1)[-1].lower()
+        if extension not in FORMATS:
+            raise CommandError('Unknown format, use --format.')
+        return extension
+
+    def read(self, source, file_format: str) -> Iterator[Row]:
+        """Numbered rows, lines which are not JSON come as None."""
+        if file_format == 'csv':
+            reader = csv.DictReader(source)
+            for row in reader:
+                yield reader.line_num, row
+            return
+        for number, line in enumerate(source, 1):
+            if not line.strip():
+                continue
+            try:
+                yield number, json.loads(line)
+            except ValueError:
+                yield number, None
+
+    def import_chunk(self, rows: Iterator[Row], size: int) -> bool:
+        """Insert up to size rows in one transaction, False at the end."""
+        chunk = itertools.islice(rows, size)
+        inserted: bool = False
+        with transaction.atomic():
+            while True:
+                batch: List[Row] = list(
+                    itertools.islice(chunk, self.batch_size)
+                )
+                if not batch:
+                    return inserted
+                inserted = True
+                # PostRow skips bookkeeping of Post, finish() does it once.
+                PostRow.objects.bulk_create(self.build_posts(batch))
+
+    def skip_malformed(self, number: int, reason: str) -> None:
+        self.skipped += 1
+        self.stderr.write(f'Row {number} skipped: {reason}.')
+
+    def get_malformed_reason(self, row) -> Optional[str]:
+        if not isinstance(row, dict):
+            return 'not a JSON object'
+        if any(not isinstance(row.get(field) or '', str)
+               for field in KEY_FIELDS):
+            return 'fields must be strings'
+        return None
+
+    def build_posts(self, batch: List[Row]) -> List[PostRow]:
+        rows: List[Row] = []
+        for number, row in batch:
+            reason: Optional[str] = self.get_malformed_reason(row)
+            if reason:
+                self.skip_malformed(number, reason)
+            else:
+                rows.append((number, row))
+        self.authors.load(row.get('author') for _, row in rows)
+        self.groups.load(row.get('group') for _, row in rows)
+        now = timezone.now()
+        posts: List[PostRow] = []
+        for number, row in rows:
+            try:
+                post: Optional[PostRow] = self.build_post(row, now)
+            except ValueError:
+                self.skip_malformed(number, 'invalid pub_date')
+                continue
+            if post is None:
+                self.skipped += 1
+                continue
+            posts.append(post)
+            self.author_ids.add(post.author_id)
+            self.group_ids.add(post.group_id)
+        self.imported += len(posts)
+        return posts
+
+    def build_post(self, row: dict, now) -> Optional[PostRow]:
+        author_id = self.authors.get(row.get('author'))
+        group_id = self.groups.get(row.get('group'))
+        if author_id is None or not row.get('text') or (
+                row.get('group') and group_id is None):
+            return None
+        raw_date: str = row.get('pub_date')
+        pub_date = parse_datetime(raw_date) if raw_date else now
+        if pub_date is None:
+            raise ValueError(raw_date)
+        if timezone.is_naive(pub_date):
+            pub_date = timezone.make_aware(pub_date)
+        return PostRow(text=row['text'], author_id=author_id,
+                       group_id=group_id, pub_date=pub_date,
+                       modified=pub_date)
+
+    def finish(self) -> None:
+        """Counters, timeline and feeds fixed once for whole import."""
+        call_command('recount_posts', stdout=self.stdout)
+        call_command('rebuild_timeline', stdout=self.stdout)
+        invalidate_post_feeds(self.author_ids, self.group_ids)
+
+    def get_rate(self) -> float:
+        elapsed: float = time.perf_counter() - self.started
+        return (self.imported + self.skipped) / elapsed if elapsed else 0
+
+    def report(self) -> None:
+        self.stdout.write(
+            f'{self.imported} imported, {self.skipped} skipped '
+            f'({self.get_rate():.0f} rows/s)'
+        )
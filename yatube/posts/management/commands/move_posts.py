@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from posts.bulk import BULK_CHUNK_SIZE, filter_posts, move_posts
+from posts.models import Group
+
+
+def date_argument(value: str):
+    parsed = parse_date(value)
+    if parsed is None:
+        raise ValueError(value)
+    return parsed
+
+
+def add_filter_arguments(parser) -> None:
+    parser.add_argument('--author', help='Username.')
+    parser.add_argument('--group', help='Slug of group posts are in.')
+    parser.add_argument('--since', type=date_argument,
+                        help='First day, YYYY-MM-DD.')
+    parser.add_argument('--until', type=date_argument,
+                        help='Last day, YYYY-MM-DD.')
+    parser.add_argument('--chunk-size', type=int, default=BULK_CHUNK_SIZE)
+
+
+def progress(command: BaseCommand, started: float, verb: str):
+    """Progress callback writing done rows and rate."""
+    def report(done: int) -> None:
+        rate: float = done / (time.perf_counter() - started)
+        command.stdout.write(f'{done} {verb} ({rate:.0f} rows/s)')
+    return report
+
+
+class Command(BaseCommand):
+    help = ('Move posts picked by author, group and dates into group, or '
+            'out of any group with --clear, in chunks.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--to-group', help='Slug of target group.')
+        parser.add_argument('--clear', action='store_true')
+        add_filter_arguments(parser)
+
+    def handle(self, *args, **options):
+        if bool(options['to_group']) == options['clear']:
+            raise CommandError('Give either --to-group or --clear.')
+        group = None
+        if options['to_group']:
+            group = Group.objects.filter(slug=options['to_group'],
+                                         is_hidden=False).first()
+            if group is None:
+                raise CommandError('Target group not found.')
+        posts = filter_posts(options['author'], options['group'],
+                             options['since'], options['until'])
+        started = time.perf_counter()
+        moved = move_posts(posts, group, options['chunk_size'],
+                           progress(self, started, 'moved'))
+        self.stdout.write(self.style.SUCCESS(f'Moved {moved} posts.'))
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.bulk import BULK_CHUNK_SIZE
+from posts.deletion import process_deletion
+from posts.models import PendingDeletion
+
+
+class Command(BaseCommand):
+    help = ('Remove posts of hidden users and groups in batches, then the '
+            'users and groups. Safe to stop and run again.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int,
+                            default=BULK_CHUNK_SIZE)
+        parser.add_argument('--forever', action='store_true',
+                            help='Keep polling the queue as a worker.')
+        parser.add_argument('--sleep', type=float, default=5,
+                            help='Seconds between polls with --forever.')
+
+    def handle(self, *args, **options):
+        while True:
+            for deletion in PendingDeletion.objects.all():
+                self.stdout.write(f'Deleting {deletion.get_kind_display()} '
+                                  f'{deletion.object_id}')
+                process_deletion(deletion, options['chunk_size'],
+                                 self.report)
+            if not options['forever']:
+                break
+            time.sleep(options['sleep'])
+        self.stdout.write(self.style.SUCCESS('Deletion queue is empty.'))
+
+    def report(self, done: int) -> None:
+        self.stdout.write(f'  {done} posts done')
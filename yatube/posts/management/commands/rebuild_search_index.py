@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.search import is_search_available, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild full text search index of posts from scratch.'
+
+    def handle(self, *args, **options):
+        if not is_search_available():
+            raise CommandError('Full text search needs SQLite with FTS5.')
+        rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt.'))
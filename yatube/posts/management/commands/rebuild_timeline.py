@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from posts.cache import index_feed, invalidate_feeds
+from posts.models import TimelineEntry
+from posts.timeline import rebuild_timeline
+
+
+class Command(BaseCommand):
+    help = 'Rebuild home timeline of latest posts from scratch.'
+
+    def handle(self, *args, **options):
+        rebuild_timeline()
+        invalidate_feeds(index_feed())
+        self.stdout.write(self.style.SUCCESS(
+            f'Timeline rebuilt, {TimelineEntry.objects.count()} posts.'
+        ))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from posts.models import AuthorCounter, Group, Post
+
+
+class Command(BaseCommand):
+    help = 'Recalculate denormalized posts counters of authors and groups.'
+
+    def handle(self, *args, **options):
+        group_posts = Post.objects.filter(
+            group=OuterRef('pk')
+        ).order_by().values('group').annotate(
+            total=Count('pk')
+        ).values('total')
+        author_posts = Post.objects.order_by().values('author').annotate(
+            total=Count('pk')
+        )
+        with transaction.atomic():
+            groups: int = Group.objects.update(
+                posts_count=Coalesce(Subquery(group_posts), 0)
+            )
+            AuthorCounter.objects.all().delete()
+            authors = AuthorCounter.objects.bulk_create(
+                AuthorCounter(user_id=row['author'], posts_count=row['total'])
+                for row in author_posts
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Recounted posts of {groups} groups and {len(authors)} authors.'
+        ))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.deletion import schedule_deletion
+from posts.models import Group, User
+
+
+class Command(BaseCommand):
+    help = ('Hide user or group now and queue its posts for removal by '
+            'process_deletions.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Username.')
+        parser.add_argument('--group', help='Group slug.')
+
+    def handle(self, *args, **options):
+        if bool(options['user']) == bool(options['group']):
+            raise CommandError('Give either --user or --group.')
+        if options['user']:
+            instance = User.objects.filter(username=options['user']).first()
+        else:
+            instance = Group.objects.filter(slug=options['group']).first()
+        if instance is None:
+            raise CommandError('User or group not found.')
+        schedule_deletion(instance)
+        self.stdout.write(self.style.SUCCESS(f'{instance} is hidden and '
+                                             'queued for deletion.'))
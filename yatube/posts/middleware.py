@@ -0,0 +1,121 @@
+from functools import lru_cache
+from typing import Callable, List, Optional
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.urls import Resolver404, ResolverMatch, resolve
+from django.utils.cache import (get_conditional_response, patch_cache_control,
+                                patch_vary_headers)
+
+from core.cache import get_or_compute
+
+from .cache import (FEED_CACHE_TIMEOUT, FEED_PAGE_KEY, PAGE_CACHE_MAX_AGE,
+                    forget_feeds, get_cached_page_number,
+                    get_feed_generation, has_private_state, make_feed_key)
+
+
+PAGE_RESOLVE_CACHE_SIZE: int = getattr(settings, 'PAGE_RESOLVE_CACHE_SIZE',
+                                       4096)
+
+
+@lru_cache(maxsize=PAGE_RESOLVE_CACHE_SIZE)
+def resolve_path(path: str, urlconf: str) -> Optional[ResolverMatch]:
+    """Match of path before the handler resolves it, memoized."""
+    try:
+        return resolve(path, urlconf)
+    except Resolver404:
+        return None
+
+
+def is_feed_page(match: Optional[ResolverMatch]) -> bool:
+    return match is not None and hasattr(match.func, 'page_cache_feed')
+
+
+def get_page_feeds(match: ResolverMatch) -> List[str]:
+    """Feed of cache_feed_page view first, then its related feeds."""
+    feed_key: Callable[..., str] = match.func.page_cache_feed
+    related = match.func.page_cache_related_feeds
+    return [feed_key(**match.kwargs),
+            *(related(**match.kwargs) if related else ())]
+
+
+def make_public(response: HttpResponse) -> None:
+    """Let proxies share page between visitors without cookies."""
+    patch_vary_headers(response, ('Cookie',))
+    patch_cache_control(response, public=True, max_age=PAGE_CACHE_MAX_AGE)
+
+
+def is_storable(response: HttpResponse) -> bool:
+    """Page of anyone but this visitor, set cookies tell the opposite."""
+    return (response.status_code == 200 and not response.streaming
+            and not response.cookies)
+
+
+def get_conditional(request, response: HttpResponse) -> HttpResponse:
+    """304 for cached page already held by client, else the page."""
+    return get_conditional_response(request, etag=response.get('ETag'),
+                                    response=response)
+
+
+class AnonymousPageCacheMiddleware:
+    """Whole pages of cache_feed_page views for anonymous visitors.
+
+    Sits before SessionMiddleware: a visitor without session or
+    messages cookie gets cached page without sessions, auth or view
+    being touched. Pages live until generation of their feed or any
+    related feed is bumped from posts.signals, responses setting
+    cookies are never stored. Only one worker renders an expired page,
+    others get the stale one. 404s drop generations of their feeds.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request) -> HttpResponse:
+        page: Optional[int] = get_cached_page_number(request)
+        if page is None:
+            # Nothing to look up, the handler's own match tells the rest.
+            response: HttpResponse = self.get_response(request)
+            match: Optional[ResolverMatch] = getattr(
+                request, 'resolver_match', None
+            )
+            if is_feed_page(match):
+                self.patch(request, response)
+                self.forget_missing(response, get_page_feeds(match))
+            return response
+
+        match = resolve_path(
+            request.path_info,
+            getattr(request, 'urlconf', None) or settings.ROOT_URLCONF
+        )
+        if not is_feed_page(match):
+            return self.get_response(request)
+        # Cache hits never reach the view, metrics still count them.
+        request.resolver_match = match
+        feeds: List[str] = get_page_feeds(match)
+        response = get_or_compute(
+            make_feed_key(FEED_PAGE_KEY, feeds[0], page=page),
+            lambda: self.render(request), FEED_CACHE_TIMEOUT,
+            version=tuple(get_feed_generation(feed) for feed in feeds),
+            cacheable=is_storable,
+        )
+        self.forget_missing(response, feeds)
+        return get_conditional(request, response)
+
+    def patch(self, request, response: HttpResponse) -> None:
+        if has_private_state(request):
+            patch_cache_control(response, private=True)
+        elif is_storable(response):
+            make_public(response)
+
+    def forget_missing(self, response: HttpResponse,
+                       feeds: List[str]) -> None:
+        """404 page has no object behind, random paths leave no keys."""
+        if response.status_code == 404:
+            forget_feeds(feeds)
+
+    def render(self, request) -> HttpResponse:
+        response: HttpResponse = self.get_response(request)
+        if is_storable(response):
+            make_public(response)
+        return response
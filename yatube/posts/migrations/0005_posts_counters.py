@@ -0,0 +1,49 @@
+# Generated by Django 2.2.28 on 2026-10-18 02:22
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+def fill_posts_counters(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Group = apps.get_model('posts', 'Group')
+    AuthorCounter = apps.get_model('posts', 'AuthorCounter')
+    group_posts = Post.objects.filter(
+        group=OuterRef('pk')
+    ).order_by().values('group').annotate(
+        total=Count('pk')
+    ).values('total')
+    Group.objects.update(posts_count=Coalesce(Subquery(group_posts), 0))
+    AuthorCounter.objects.bulk_create(
+        AuthorCounter(user_id=row['author'], posts_count=row['total'])
+        for row in Post.objects.order_by().values('author').annotate(
+            total=Count('pk')
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0004_auto_20220825_2026'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='posts_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('posts_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_posts_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 2.2.28 on 2026-10-18 03:10
+
+from django.db import migrations
+
+
+CREATE_SEARCH_INDEX = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS posts_post_fts USING fts5(
+        text, content='posts_post', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS posts_post_fts_insert
+    AFTER INSERT ON posts_post BEGIN
+        INSERT INTO posts_post_fts(rowid, text) VALUES (new.id, new.text);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS posts_post_fts_delete
+    AFTER DELETE ON posts_post BEGIN
+        INSERT INTO posts_post_fts(posts_post_fts, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS posts_post_fts_update
+    AFTER UPDATE OF text ON posts_post BEGIN
+        INSERT INTO posts_post_fts(posts_post_fts, rowid, text)
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO posts_post_fts(rowid, text) VALUES (new.id, new.text);
+    END""",
+    "INSERT INTO posts_post_fts(posts_post_fts) VALUES ('rebuild')",
+]
+
+DROP_SEARCH_INDEX = [
+    'DROP TRIGGER IF EXISTS posts_post_fts_insert',
+    'DROP TRIGGER IF EXISTS posts_post_fts_delete',
+    'DROP TRIGGER IF EXISTS posts_post_fts_update',
+    'DROP TABLE IF EXISTS posts_post_fts',
+]
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in CREATE_SEARCH_INDEX:
+            schema_editor.execute(statement)
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in DROP_SEARCH_INDEX:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0007_post_modified'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 2.2.28 on 2026-10-18 02:38
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_timeline(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    TimelineEntry = apps.get_model('posts', 'TimelineEntry')
+    size = getattr(settings, 'TIMELINE_SIZE', 1000)
+    TimelineEntry.objects.bulk_create(
+        TimelineEntry(
+            post_id=post.pk,
+            text=post.text,
+            pub_date=post.pub_date,
+            modified=post.modified,
+            author_id=post.author_id,
+            author_username=post.author.username,
+            author_full_name=(
+                f'{post.author.first_name} {post.author.last_name}'.strip()
+            ),
+            group_id=post.group_id,
+            group_slug=post.group.slug if post.group else '',
+            group_title=post.group.title if post.group else '',
+        )
+        for post in Post.objects.select_related('author', 'group').order_by(
+            '-pub_date', '-id'
+        )[:size]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_post_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='timeline_entry', serialize=False, to='posts.Post')),
+                ('text', models.TextField()),
+                ('pub_date', models.DateTimeField()),
+                ('modified', models.DateTimeField()),
+                ('author_id', models.PositiveIntegerField(db_index=True)),
+                ('author_username', models.CharField(max_length=150)),
+                ('author_full_name', models.CharField(blank=True, max_length=300)),
+                ('group_id', models.PositiveIntegerField(db_index=True, null=True)),
+                ('group_slug', models.CharField(blank=True, max_length=255)),
+                ('group_title', models.CharField(blank=True, max_length=200)),
+            ],
+            options={
+                'ordering': ('-pub_date', '-post_id'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='timelineentry',
+            index=models.Index(fields=['-pub_date', '-post'], name='timeline_feed_idx'),
+        ),
+        migrations.RunPython(fill_timeline, migrations.RunPython.noop),
+    ]
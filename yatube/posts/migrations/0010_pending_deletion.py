@@ -0,0 +1,32 @@
+# Generated by Django 2.2.28 on 2026-10-18 02:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_timeline'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='is_hidden',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.CreateModel(
+            name='PendingDeletion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('user', 'Пользователь'), ('group', 'Группа')], max_length=5)),
+                ('object_id', models.PositiveIntegerField()),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('posts_done', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ('created',),
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 2.2.28 on 2026-10-18 03:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_pending_deletion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostRow',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text', models.TextField()),
+                ('pub_date', models.DateTimeField()),
+                ('modified', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'posts_post',
+                'managed': False,
+            },
+        ),
+    ]
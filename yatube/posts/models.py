@@ -1,5 +1,9 @@
+from collections import Counter
+from typing import NamedTuple, Optional
+
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Q
 from django.urls import reverse
 
 
@@ -12,16 +16,95 @@ class Group(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(max_length=255, unique=True)
     description = models.TextField()
+    posts_count = models.PositiveIntegerField(default=0, editable=False)
+    is_hidden = models.BooleanField(default=False, editable=False)
 
     def __str__(self) -> str:
         return self.title
 
+    @classmethod
+    def change_posts_count(cls, group_id: int, delta: int) -> None:
+        """Shift posts counter of group by delta."""
+        if group_id is None or not delta:
+            return
+        groups = cls.objects.filter(pk=group_id)
+        if delta < 0:
+            groups = groups.filter(posts_count__gte=-delta)
+        groups.update(posts_count=F('posts_count') + delta)
+
+
+class AuthorCounter(models.Model):
+    """Denormalized counters of author."""
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='posts_counter'
+    )
+    posts_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f'{self.user_id}: {self.posts_count}'
+
+    @classmethod
+    def change_posts_count(cls, user_id: int, delta: int) -> None:
+        """Shift posts counter of author by delta."""
+        if user_id is None or not delta:
+            return
+        counters = cls.objects.filter(pk=user_id)
+        if delta < 0:
+            counters = counters.filter(posts_count__gte=-delta)
+        if counters.update(posts_count=F('posts_count') + delta) or delta < 0:
+            return
+        try:
+            # Savepoint, so a lost race leaves outer transaction usable.
+            with transaction.atomic():
+                cls.objects.create(user_id=user_id, posts_count=delta)
+        except IntegrityError:
+            # First post of author saved concurrently, counter exists now.
+            counters.update(posts_count=F('posts_count') + delta)
+
+    @staticmethod
+    def get_posts_count(user) -> int:
+        """Posts count of user without touching posts table."""
+        try:
+            return user.posts_counter.posts_count
+        except AuthorCounter.DoesNotExist:
+            return 0
+
+
+class PostQuerySet(models.QuerySet):
+    def visible(self) -> 'PostQuerySet':
+        """Posts whose author and group are not pending deletion."""
+        return self.filter(Q(group=None) | Q(group__is_hidden=False),
+                           author__is_active=True)
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """Insert posts and keep author and group counters in step."""
+        with transaction.atomic(using=self.db):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            authors = Counter(post.author_id for post in objs)
+            groups = Counter(post.group_id for post in objs)
+            for author_id, delta in authors.items():
+                AuthorCounter.change_posts_count(author_id, delta)
+            for group_id, delta in groups.items():
+                Group.change_posts_count(group_id, delta)
+        # bulk_create sends no post_save, so feeds are dropped by hand.
+        from .signals import invalidate_post_feeds
+        from .timeline import push_new_posts
+        invalidate_post_feeds(authors, groups)
+        if objs:
+            push_new_posts()
+        return objs
+
 
 class Post(models.Model):
     """Model of posts."""
 
     text = models.TextField()
     pub_date = models.DateTimeField(auto_now_add=True)
+    modified = models.DateTimeField(auto_now=True)
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -35,11 +118,186 @@ class Post(models.Model):
         related_name='posts'
     )
 
+    objects = PostQuerySet.as_manager()
+
+    _saved_author_id = None
+    _saved_group_id = None
+
     class Meta:
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(fields=('group', '-pub_date', '-id'),
+                         name='post_group_feed_idx'),
+            models.Index(fields=('author', '-pub_date', '-id'),
+                         name='post_author_feed_idx'),
+            models.Index(fields=('-pub_date', '-id'),
+                         name='post_feed_idx'),
+        )
 
     def __str__(self) -> str:
         return self.text[:15]
 
+    @property
+    def is_visible(self) -> bool:
+        """Python side of PostQuerySet.visible(), relations are read."""
+        if not self.author.is_active:
+            return False
+        return self.group is None or not self.group.is_hidden
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_relations()
+        return instance
+
+    def _remember_relations(self) -> None:
+        self._saved_author_id = self.__dict__.get('author_id',
+                                                  models.DEFERRED)
+        self._saved_group_id = self.__dict__.get('group_id', models.DEFERRED)
+
+    def _load_saved_relations(self) -> None:
+        """Fetch stored relations which were deferred at loading."""
+        author_id, group_id = type(self).objects.filter(
+            pk=self.pk
+        ).values_list('author_id', 'group_id').get()
+        if self._saved_author_id is models.DEFERRED:
+            self._saved_author_id = author_id
+        if self._saved_group_id is models.DEFERRED:
+            self._saved_group_id = group_id
+
+    def save(self, *args, **kwargs):
+        """Save post and keep author and group counters in step."""
+        adding: bool = self._state.adding
+        with transaction.atomic():
+            changed: dict = {
+                field: self.__dict__[field]
+                for field in ('author_id', 'group_id')
+                if field in self.__dict__
+            }
+            if not adding and models.DEFERRED in (self._saved_author_id,
+                                                  self._saved_group_id):
+                self._load_saved_relations()
+            super().save(*args, **kwargs)
+            if adding:
+                AuthorCounter.change_posts_count(self.author_id, 1)
+                Group.change_posts_count(self.group_id, 1)
+            else:
+                new_author_id = changed.get('author_id',
+                                            self._saved_author_id)
+                new_group_id = changed.get('group_id', self._saved_group_id)
+                if new_author_id != self._saved_author_id:
+                    AuthorCounter.change_posts_count(
+                        self._saved_author_id, -1
+                    )
+                    AuthorCounter.change_posts_count(new_author_id, 1)
+                if new_group_id != self._saved_group_id:
+                    Group.change_posts_count(self._saved_group_id, -1)
+                    Group.change_posts_count(new_group_id, 1)
+        self._remember_relations()
+
     def get_absolute_url(self):
         return reverse('posts:post_detail', kwargs={'post_id': self.id})
+
+
+class PostRow(models.Model):
+    """posts_post without auto dates, bulk inserts keep given ones.
+
+    Signals, counters and timeline are left to the caller.
+    """
+
+    text = models.TextField()
+    pub_date = models.DateTimeField()
+    modified = models.DateTimeField()
+    author = models.ForeignKey(User, on_delete=models.DO_NOTHING,
+                               related_name='+')
+    group = models.ForeignKey(Group, on_delete=models.DO_NOTHING,
+                              null=True, related_name='+')
+
+    class Meta:
+        managed = False
+        db_table = Post._meta.db_table
+
+
+class TimelineAuthor(NamedTuple):
+    username: str
+    full_name: str
+
+    def get_full_name(self) -> str:
+        return self.full_name
+
+
+class TimelineGroup(NamedTuple):
+    id: int
+    slug: str
+    title: str
+
+
+class TimelineEntry(models.Model):
+    """Latest posts with author and group data copied in.
+
+    Capped at TIMELINE_SIZE entries and filled by posts.timeline on
+    write, so first pages of index need no join nor posts table.
+    """
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='timeline_entry'
+    )
+    text = models.TextField()
+    pub_date = models.DateTimeField()
+    modified = models.DateTimeField()
+    author_id = models.PositiveIntegerField(db_index=True)
+    author_username = models.CharField(max_length=150)
+    author_full_name = models.CharField(max_length=300, blank=True)
+    group_id = models.PositiveIntegerField(null=True, db_index=True)
+    group_slug = models.CharField(max_length=255, blank=True)
+    group_title = models.CharField(max_length=200, blank=True)
+
+    class Meta:
+        ordering = ('-pub_date', '-post_id')
+        indexes = (
+            models.Index(fields=('-pub_date', '-post'),
+                         name='timeline_feed_idx'),
+        )
+
+    def __str__(self) -> str:
+        return self.text[:15]
+
+    @property
+    def id(self) -> int:
+        return self.post_id
+
+    @property
+    def author(self) -> TimelineAuthor:
+        return TimelineAuthor(self.author_username, self.author_full_name)
+
+    @property
+    def group(self) -> Optional[TimelineGroup]:
+        if self.group_id is None:
+            return None
+        return TimelineGroup(self.group_id, self.group_slug, self.group_title)
+
+
+class PendingDeletion(models.Model):
+    """Hidden user or group whose posts are removed in batches."""
+
+    USER: str = 'user'
+    GROUP: str = 'group'
+    KINDS = (
+        (USER, 'Пользователь'),
+        (GROUP, 'Группа'),
+    )
+
+    kind = models.CharField(max_length=5, choices=KINDS)
+    object_id = models.PositiveIntegerField()
+    created = models.DateTimeField(auto_now_add=True)
+    posts_done = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ('created',)
+        unique_together = ('kind', 'object_id')
+
+    def __str__(self) -> str:
+        return f'{self.kind} {self.object_id}: {self.posts_done}'
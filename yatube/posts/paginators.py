@@ -0,0 +1,194 @@
+import base64
+import binascii
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple, Union
+
+from django.core.paginator import Page, Paginator
+from django.db.models import Max, Q
+from django.db.models.query import QuerySet
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+
+FORWARD: str = 'n'
+BACKWARD: str = 'p'
+
+
+def estimate_count(queryset: QuerySet) -> int:
+    """Upper bound of table rows by largest primary key, no COUNT(*)."""
+    return queryset.order_by().aggregate(last=Max('pk'))['last'] or 0
+
+
+def encode_cursor(direction: str, pub_date: datetime, pk: int) -> str:
+    """Pack feed position into opaque url-safe token."""
+    raw: str = f'{direction}|{pub_date.isoformat()}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[str, datetime, int]]:
+    """Unpack token made by encode_cursor, None for broken tokens."""
+    try:
+        padded: str = cursor + '=' * (-len(cursor) % 4)
+        raw: str = base64.urlsafe_b64decode(padded.encode()).decode()
+        direction, pub_date, pk = raw.split('|')
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if direction not in (FORWARD, BACKWARD) or pub_date is None:
+        return None
+    return direction, pub_date, pk
+
+
+class CursorPage(Page):
+    """Page which knows the keyset cursors of its neighbours."""
+
+    def __init__(self, object_list, number, paginator,
+                 has_next=None, has_previous=None):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def has_next(self) -> bool:
+        if self._has_next is None:
+            return super().has_next()
+        return self._has_next
+
+    def has_previous(self) -> bool:
+        if self._has_previous is None:
+            return super().has_previous()
+        return self._has_previous
+
+    @property
+    def is_cursor_page(self) -> bool:
+        return self.number is None
+
+    @property
+    def elided_page_range(self) -> List[Union[int, str]]:
+        if self.is_cursor_page:
+            return []
+        return list(self.paginator.get_elided_page_range(self.number))
+
+    @property
+    def next_cursor(self) -> Optional[str]:
+        if not self.paginator.ordering:
+            return None
+        if not self.has_next() or not len(self):
+            return None
+        last = self[len(self) - 1]
+        return encode_cursor(FORWARD, last.pub_date, last.pk)
+
+    @property
+    def previous_cursor(self) -> Optional[str]:
+        if not self.paginator.ordering:
+            return None
+        if not self.has_previous() or not len(self):
+            return None
+        first = self[0]
+        return encode_cursor(BACKWARD, first.pub_date, first.pk)
+
+
+class CursorPaginator(Paginator):
+    """Paginator walking feed by (pub_date, id) keyset.
+
+    Numbered pages still work through OFFSET, cursor pages cost
+    the same at any depth of the feed: the redundant pub_date bound
+    lets SQLite seek the feed index instead of scanning it.
+    """
+
+    ordering: Optional[Tuple[str, str]] = ('-pub_date', '-id')
+    ELLIPSIS: str = '…'
+
+    def __init__(self, object_list: QuerySet, per_page: int,
+                 count: Optional[int] = None, **kwargs):
+        if self.ordering:
+            object_list = object_list.order_by(*self.ordering)
+        super().__init__(object_list, per_page, **kwargs)
+        if count is not None:
+            # Known total, e.g. denormalized counter, spares COUNT(*).
+            self.count = count
+
+    def get_elided_page_range(self, number: int = 1, on_each_side: int = 2,
+                              on_ends: int = 1) -> Iterator[Union[int, str]]:
+        """Page numbers around number and at the ends, gaps elided.
+
+        Backport of Paginator.get_elided_page_range from Django 3.2.
+        """
+        number = self.validate_number(number)
+        if self.num_pages <= (on_each_side + on_ends) * 2:
+            yield from self.page_range
+            return
+        if number > (1 + on_each_side + on_ends) + 1:
+            yield from range(1, on_ends + 1)
+            yield self.ELLIPSIS
+            yield from range(number - on_each_side, number + 1)
+        else:
+            yield from range(1, number + 1)
+        if number < (self.num_pages - on_each_side - on_ends) - 1:
+            yield from range(number + 1, number + on_each_side + 1)
+            yield self.ELLIPSIS
+            yield from range(self.num_pages - on_ends + 1,
+                             self.num_pages + 1)
+        else:
+            yield from range(number + 1, self.num_pages + 1)
+
+    def _get_page(self, *args, **kwargs) -> CursorPage:
+        return CursorPage(*args, **kwargs)
+
+    def get_cursor_queryset(self, direction: str, pub_date: datetime,
+                            pk: int) -> QuerySet:
+        """Posts beyond position in direction, nearest first."""
+        if direction == FORWARD:
+            return self.object_list.filter(
+                Q(pub_date__lte=pub_date),
+                Q(pub_date__lt=pub_date) | Q(pk__lt=pk)
+            )
+        return self.object_list.filter(
+            Q(pub_date__gte=pub_date),
+            Q(pub_date__gt=pub_date) | Q(pk__gt=pk)
+        ).reverse()
+
+    def get_cursor_page(self, cursor: str) -> CursorPage:
+        """Return page after/before cursor, first page for bad cursor."""
+        position = decode_cursor(cursor)
+        if position is None:
+            return self.get_page(1)
+        rows: list = list(
+            self.get_cursor_queryset(*position)[:self.per_page + 1]
+        )
+        has_more: bool = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if position[0] == FORWARD:
+            return self._get_page(rows, None, self,
+                                  has_next=has_more, has_previous=True)
+        return self._get_page(rows[::-1], None, self,
+                              has_next=True, has_previous=has_more)
+
+
+class RankedPaginator(CursorPaginator):
+    """Numbered pages of queryset in its own order, e.g. search rank."""
+
+    ordering = None
+
+
+class TimelinePaginator(CursorPaginator):
+    """Pages of timeline entries, keyed by post as posts are by id."""
+
+    ordering = ('-pub_date', '-post_id')
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator which never counts the whole table.
+
+    Unfiltered queryset is estimated by its largest primary key, one
+    index lookup, filtered ones are counted up to COUNT_LIMIT rows.
+    """
+
+    COUNT_LIMIT: int = 10000
+
+    @cached_property
+    def count(self) -> int:
+        queryset: QuerySet = self.object_list.order_by()
+        if not queryset.query.where:
+            return estimate_count(queryset)
+        return queryset[:self.COUNT_LIMIT].count()
@@ -0,0 +1,104 @@
+import re
+from typing import List
+
+from django.db import connection
+from django.db.models.query import QuerySet
+
+
+FTS_TABLE: str = 'posts_post_fts'
+
+# External content FTS5 table over posts_post.text, kept in step by
+# triggers, so bulk_create and queryset updates are indexed as well.
+# Migration 0008 holds its own copy of this SQL. Migrations which remake
+# posts_post drop the triggers, posts.checks reports that and
+# rebuild_search_index puts them back.
+CREATE_SEARCH_INDEX: List[str] = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        text, content='posts_post', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert
+    AFTER INSERT ON posts_post BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete
+    AFTER DELETE ON posts_post BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update
+    AFTER UPDATE OF text ON posts_post BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END""",
+]
+
+SEARCH_TRIGGERS: List[str] = [
+    f'{FTS_TABLE}_insert', f'{FTS_TABLE}_delete', f'{FTS_TABLE}_update',
+]
+
+REBUILD_SEARCH_INDEX: str = (
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+)
+
+WORD = re.compile(r'\w+')
+
+
+def is_search_available(db=connection) -> bool:
+    """Full text search lives in SQLite FTS5 only."""
+    return db.vendor == 'sqlite'
+
+
+def get_missing_triggers(db=connection) -> List[str]:
+    """Search triggers absent while the search table exists."""
+    with db.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' "
+            "AND name = %s", [FTS_TABLE]
+        )
+        if cursor.fetchone() is None:
+            return []
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+            "AND tbl_name = 'posts_post'"
+        )
+        existing = {name for name, in cursor.fetchall()}
+    return [name for name in SEARCH_TRIGGERS if name not in existing]
+
+
+def rebuild_search_index() -> None:
+    """Reindex every post from scratch."""
+    with connection.cursor() as cursor:
+        for statement in CREATE_SEARCH_INDEX + [REBUILD_SEARCH_INDEX]:
+            cursor.execute(statement)
+
+
+def build_match_query(query: str) -> str:
+    """FTS5 query where every word must match, the last one as prefix.
+
+    Words are quoted, so user input never reaches FTS5 syntax.
+    """
+    words: List[str] = WORD.findall(query)
+    if not words:
+        return ''
+    terms: List[str] = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search_posts(queryset: QuerySet, query: str) -> QuerySet:
+    """Posts of queryset matching query, most relevant first."""
+    match: str = build_match_query(query)
+    if not match:
+        return queryset.none()
+    if not is_search_available(connection):
+        return queryset.filter(text__icontains=query)
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[f'{FTS_TABLE}.rowid = posts_post.id',
+               f'{FTS_TABLE} MATCH %s'],
+        params=[match],
+        select={'rank': f'{FTS_TABLE}.rank'},
+        order_by=['rank', '-pub_date'],
+    )
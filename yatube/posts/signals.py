@@ -0,0 +1,179 @@
+from django.db import transaction
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+
+from .cache import (group_feed, index_feed, invalidate_feeds, post_feed,
+                    profile_feed)
+from .lookups import groups, posts, users
+from .models import AuthorCounter, Group, Post, User
+from .timeline import (drop_group, fill_timeline, push_post, update_author,
+                       update_group)
+
+AUTHOR_NAME_FIELDS = ('username', 'first_name', 'last_name')
+AUTHOR_DISPLAY_FIELDS = set(AUTHOR_NAME_FIELDS)
+
+
+def invalidate_post_feeds(author_ids, group_ids, post_ids=()) -> None:
+    """Drop cached pages of every feed the posts show up in."""
+    usernames = User.objects.filter(
+        pk__in={pk for pk in author_ids if isinstance(pk, int)}
+    ).values_list('username', flat=True)
+    slugs = Group.objects.filter(
+        pk__in={pk for pk in group_ids if isinstance(pk, int)}
+    ).values_list('slug', flat=True)
+    invalidate_feeds(
+        index_feed(),
+        *(profile_feed(username) for username in usernames),
+        *(group_feed(slug) for slug in slugs),
+        *(post_feed(pk) for pk in post_ids),
+    )
+
+
+@receiver(post_save, sender=Post)
+def invalidate_saved_post_feeds(sender, instance: Post, **kwargs) -> None:
+    """New or edited post changes its feeds, the old ones included."""
+    invalidate_post_feeds(
+        (instance.author_id, instance._saved_author_id),
+        (instance.group_id, instance._saved_group_id),
+        (instance.pk,),
+    )
+
+
+@receiver(post_save, sender=Post)
+def push_saved_post(sender, instance: Post, created: bool,
+                    **kwargs) -> None:
+    push_post(instance, created)
+
+
+@receiver(post_delete, sender=Post)
+def decrease_posts_counters(sender, instance: Post, **kwargs) -> None:
+    """Keep counters in step with deleted post, cascades included."""
+    AuthorCounter.change_posts_count(instance.author_id, -1)
+    Group.change_posts_count(instance.group_id, -1)
+    invalidate_post_feeds((instance.author_id,), (instance.group_id,),
+                          (instance.pk,))
+
+
+@receiver(post_delete, sender=Post)
+def fill_timeline_gap(sender, instance: Post, **kwargs) -> None:
+    """Entry went away along with post, the next older one moves in."""
+    fill_timeline()
+
+
+@receiver(pre_save, sender=Group)
+def remember_group_names(sender, instance: Group, **kwargs) -> None:
+    """Slug and title before save, feeds linking the group need them."""
+    instance._saved_names = None
+    if instance.pk is not None:
+        instance._saved_names = Group.objects.filter(
+            pk=instance.pk
+        ).values_list('slug', 'title').first()
+
+
+def invalidate_group_feeds(group: Group, *slugs: str) -> None:
+    """Drop feeds showing posts of group, profiles of its authors too.
+
+    Extra slugs are old ones of renamed group.
+    """
+    invalidate_feeds(
+        index_feed(),
+        *(group_feed(slug) for slug in {group.slug, *slugs}),
+        *(profile_feed(username) for username in User.objects.filter(
+            posts__group=group
+        ).distinct().values_list('username', flat=True))
+    )
+
+
+@receiver(post_save, sender=Group)
+def invalidate_group_feed(sender, instance: Group, created: bool,
+                          **kwargs) -> None:
+    """Renamed group is linked from index and profiles, drop them too."""
+    saved_names = getattr(instance, '_saved_names', None)
+    if saved_names is None or saved_names == (instance.slug, instance.title):
+        invalidate_feeds(group_feed(instance.slug))
+    else:
+        invalidate_group_feeds(instance, saved_names[0])
+    if not created:
+        update_group(instance)
+
+
+@receiver(pre_delete, sender=Group)
+def invalidate_deleted_group_feeds(sender, instance: Group,
+                                   **kwargs) -> None:
+    """Posts lose group silently through SET NULL, drop all feeds."""
+    invalidate_group_feeds(instance)
+    drop_group(instance)
+
+
+def invalidate_author_feeds(user_id: int, *usernames: str) -> None:
+    """Drop feeds showing names of author, the old ones included."""
+    invalidate_feeds(
+        index_feed(),
+        *(profile_feed(username) for username in usernames),
+        *(group_feed(slug) for slug in Group.objects.filter(
+            posts__author_id=user_id
+        ).distinct().values_list('slug', flat=True))
+    )
+
+
+@receiver(pre_save, sender=User)
+def remember_author_names(sender, instance: User, update_fields=None,
+                          **kwargs) -> None:
+    """Names before save, logins only touch last_login and skip it."""
+    instance._saved_names = None
+    if instance.pk is None or (
+            update_fields is not None
+            and not AUTHOR_DISPLAY_FIELDS & set(update_fields)):
+        return
+    instance._saved_names = User.objects.filter(pk=instance.pk).values_list(
+        *AUTHOR_NAME_FIELDS
+    ).first()
+
+
+@receiver(post_save, sender=User)
+def update_renamed_author(sender, instance: User, **kwargs) -> None:
+    """Copy new names of author to timeline and drop feeds with old."""
+    saved_names = getattr(instance, '_saved_names', None)
+    names = tuple(getattr(instance, field) for field in AUTHOR_NAME_FIELDS)
+    if saved_names is None or saved_names == names:
+        return
+    update_author(instance)
+    invalidate_author_feeds(instance.pk, saved_names[0], instance.username)
+
+
+# Objects are written through once committed, after the receivers
+# above bumped generations of their feeds: rolled back state must
+# never reach the cache. Remembered misses carry no version, they go
+# at once.
+@receiver(post_save, sender=Post)
+def write_through_post(sender, instance: Post, **kwargs) -> None:
+    posts.delete(instance.pk)
+    transaction.on_commit(lambda: posts.set(instance))
+
+
+@receiver(post_save, sender=Group)
+def write_through_group(sender, instance: Group, **kwargs) -> None:
+    groups.delete(instance.slug)
+    transaction.on_commit(lambda: groups.set(instance))
+
+
+@receiver(post_save, sender=User)
+def write_through_user(sender, instance: User, **kwargs) -> None:
+    users.delete(instance.username)
+    transaction.on_commit(lambda: users.set(instance))
+
+
+@receiver(post_delete, sender=Post)
+def forget_deleted_post(sender, instance: Post, **kwargs) -> None:
+    posts.delete(instance.pk)
+
+
+@receiver(post_delete, sender=Group)
+def forget_deleted_group(sender, instance: Group, **kwargs) -> None:
+    groups.delete(instance.slug)
+
+
+@receiver(post_delete, sender=User)
+def forget_deleted_user(sender, instance: User, **kwargs) -> None:
+    users.delete(instance.username)
@@ -0,0 +1,136 @@
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Group, PendingDeletion, Post, User
+
+
+class PostAdminTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass'
+        )
+        cls.groups = Group.objects.bulk_create(
+            Group(title=f'Группа {i}', slug=f'group-{i}',
+                  description='Описание')
+            for i in range(5)
+        )
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=cls.admin)
+            for i in range(150)
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.admin)
+        self.url = reverse('admin:posts_post_changelist')
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        """Список постов не считает таблицу и не строит select на строку."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        sqls = [query['sql'] for query in queries]
+        self.assertFalse([sql for sql in sqls if 'COUNT(' in sql])
+        self.assertEqual(
+            len([sql for sql in sqls if 'FROM "posts_group"' in sql]), 1
+        )
+        self.assertLess(len(sqls), 12)
+
+    def test_changelist_walks_by_cursor(self):
+        """Ссылка «Далее» открывает следующую страницу по курсору."""
+        first = self.client.get(self.url).context['cl']
+        second = self.client.get(self.url + first.next_page_query)
+        second_ids = [post.pk for post in second.context['cl'].result_list]
+        first_ids = [post.pk for post in first.result_list]
+        self.assertEqual(len(second_ids), 50)
+        self.assertFalse(set(first_ids) & set(second_ids))
+        self.assertLess(max(second_ids), min(first_ids))
+
+    def test_search_pages_by_number(self):
+        """Поиск по рангу листается номерами страниц без курсора."""
+        first = self.client.get(self.url, {'q': 'Пост'}).context['cl']
+        self.assertIsNone(first.next_page_query)
+        self.assertNotIn('cursor', first.get_query_string({'p': 1}))
+        second = self.client.get(
+            self.url + first.get_query_string({'p': 1})
+        ).context['cl']
+        first_ids = {post.pk for post in first.result_list}
+        second_ids = {post.pk for post in second.result_list}
+        self.assertEqual(len(first_ids), 100)
+        self.assertEqual(len(second_ids), 50)
+        self.assertFalse(first_ids & second_ids)
+
+    def test_change_form_uses_raw_id_and_autocomplete(self):
+        """Форма поста не выводит всех авторов и все группы."""
+        post = Post.objects.first()
+        response = self.client.get(
+            reverse('admin:posts_post_change', args=[post.pk])
+        )
+        self.assertContains(response, 'vForeignKeyRawIdAdminField')
+        self.assertContains(response, 'admin-autocomplete')
+        self.assertNotContains(response, self.groups[-1].title)
+
+    def test_move_action_moves_selected_posts(self):
+        """Действие админки переносит выбранные посты в группу."""
+        ids = list(Post.objects.values_list('pk', flat=True)[:3])
+        self.client.post(self.url, {
+            'action': 'move_to_group',
+            'index': 0,
+            'group': self.groups[0].slug,
+            '_selected_action': ids,
+        })
+        group = Group.objects.get(slug=self.groups[0].slug)
+        self.assertEqual(
+            set(group.posts.values_list('pk', flat=True)), set(ids)
+        )
+        self.assertEqual(group.posts_count, 3)
+
+    def test_move_action_skips_hidden_group(self):
+        """В группу, ожидающую удаления, посты не переносятся."""
+        ids = list(Post.objects.values_list('pk', flat=True)[:3])
+        Group.objects.filter(slug=self.groups[1].slug).update(is_hidden=True)
+        response = self.client.post(self.url, {
+            'action': 'move_to_group',
+            'index': 0,
+            'group': self.groups[1].slug,
+            '_selected_action': ids,
+        }, follow=True)
+        self.assertContains(response, f'Нет группы «{self.groups[1].slug}».')
+        self.assertFalse(
+            Post.objects.filter(group__slug=self.groups[1].slug).exists()
+        )
+
+    def test_delete_in_chunks_asks_first(self):
+        """Удаление пачками сначала показывает страницу подтверждения."""
+        ids = list(Post.objects.values_list('pk', flat=True)[:3])
+        data = {
+            'action': 'delete_in_chunks',
+            'index': 0,
+            '_selected_action': ids,
+        }
+        response = self.client.post(self.url, data)
+        self.assertTemplateUsed(
+            response, 'admin/posts/post/delete_in_chunks_confirmation.html'
+        )
+        self.assertEqual(response.context['count'], 3)
+        self.assertEqual(Post.objects.filter(pk__in=ids).count(), 3)
+        self.client.post(self.url, {**data, 'post': 'yes'})
+        self.assertFalse(Post.objects.filter(pk__in=ids).exists())
+        self.assertEqual(Post.objects.count(), 147)
+
+    def test_user_deletion_goes_through_queue(self):
+        """Удаление пользователя в админке ставит его в очередь."""
+        user = User.objects.create_user(username='leaving')
+        Post.objects.create(text='Пост уходящего', author=user)
+        self.client.post(
+            reverse('admin:auth_user_delete', args=[user.pk]),
+            {'post': 'yes'}
+        )
+        self.assertFalse(User.objects.get(pk=user.pk).is_active)
+        self.assertTrue(Post.objects.filter(author=user).exists())
+        self.assertTrue(PendingDeletion.objects.filter(
+            kind=PendingDeletion.USER, object_id=user.pk
+        ).exists())
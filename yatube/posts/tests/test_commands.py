@@ -0,0 +1,387 @@
+import csv
+import gzip
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.checks import check_search_triggers
+from posts.deletion import process_deletion
+from posts.models import (AuthorCounter, Group, PendingDeletion, Post,
+                          TimelineEntry, User)
+from posts.search import SEARCH_TRIGGERS, get_missing_triggers, search_posts
+
+
+class GenerateDataCommandTest(TestCase):
+    def test_generate_data_creates_consistent_data(self):
+        """generate_data создает данные с верными счетчиками."""
+        call_command('generate_data', users=20, groups=5, posts=300,
+                     seed=1, stdout=StringIO())
+        self.assertEqual(User.objects.count(), 20)
+        self.assertEqual(Group.objects.count(), 5)
+        self.assertEqual(Post.objects.count(), 300)
+        self.assertEqual(
+            sum(AuthorCounter.objects.values_list('posts_count', flat=True)),
+            300
+        )
+        self.assertEqual(
+            sum(Group.objects.values_list('posts_count', flat=True)),
+            Post.objects.exclude(group=None).count()
+        )
+        self.assertGreater(
+            Post.objects.dates('pub_date', 'day').count(), 1
+        )
+
+
+class BenchViewsCommandTest(TestCase):
+    def test_bench_views_saves_baseline(self):
+        """bench_views сохраняет перцентили и число запросов."""
+        call_command('generate_data', users=5, groups=2, posts=30,
+                     seed=1, stdout=StringIO())
+        posts_count = Post.objects.count()
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = os.path.join(directory, 'baseline.json')
+            call_command('bench_views', requests=3, seed=1,
+                         baseline=baseline, save_baseline=True,
+                         stdout=StringIO())
+            with open(baseline) as baseline_file:
+                results = json.load(baseline_file)
+        self.assertEqual(
+            set(results['index']), {'p50', 'p95', 'p99', 'queries'}
+        )
+        self.assertEqual(Post.objects.count(), posts_count)
+
+
+class RebuildSearchIndexCommandTest(TestCase):
+    def test_rebuild_search_index_restores_lost_rows(self):
+        """rebuild_search_index заново индексирует все посты."""
+        user = User.objects.create_user(username='auth')
+        Post.objects.create(text='Потерянный пост', author=user)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO posts_post_fts(posts_post_fts) "
+                "VALUES ('delete-all')"
+            )
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertTrue(search_posts(Post.objects.all(), 'потерянный'))
+
+    def test_triggers_exist_after_migrate(self):
+        """После миграций триггеры поиска на месте."""
+        self.assertEqual(get_missing_triggers(), [])
+        self.assertEqual(check_search_triggers(None), [])
+
+    def test_lost_trigger_reported_and_restored(self):
+        """Пропавший триггер виден в проверке и возвращается командой."""
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TRIGGER {SEARCH_TRIGGERS[0]}')
+        warnings = check_search_triggers(None)
+        self.assertEqual([warning.id for warning in warnings],
+                         ['posts.W001'])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(get_missing_triggers(), [])
+
+
+class ImportPostsCommandTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    def import_file(self, extension: str, content: str) -> str:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, f'posts.{extension}')
+            with open(path, 'w', encoding='utf-8') as source:
+                source.write(content)
+            out = StringIO()
+            self.err = StringIO()
+            call_command('import_posts', path, batch_size=2,
+                         transaction_size=3, stdout=out, stderr=self.err)
+        return out.getvalue()
+
+    def test_import_jsonl_keeps_counters_and_search(self):
+        """import_posts загружает JSONL, обновляя счетчики и поиск."""
+        rows = [
+            {'text': f'Импортированный пост {i}', 'author': 'auth',
+             'group': 'test-slug', 'pub_date': '2020-01-0{}T10:00'.format(
+                 i + 1)}
+            for i in range(5)
+        ]
+        rows.append({'text': 'Чужой пост', 'author': 'nobody'})
+        out = self.import_file(
+            'jsonl', '\n'.join(json.dumps(row) for row in rows)
+        )
+        self.assertIn('Imported 5 posts, skipped 1', out)
+        self.assertEqual(Post.objects.count(), 5)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 5)
+        self.assertEqual(
+            AuthorCounter.get_posts_count(User.objects.get(pk=self.user.pk)),
+            5
+        )
+        self.assertEqual(
+            Post.objects.earliest('pub_date').pub_date.date().isoformat(),
+            '2020-01-01'
+        )
+        self.assertEqual(
+            search_posts(Post.objects.all(), 'импортированный').count(), 5
+        )
+
+    def test_import_skips_malformed_rows(self):
+        """Битые строки пропускаются с сообщением, импорт продолжается."""
+        lines = [
+            json.dumps({'text': 'Первый', 'author': 'auth'}),
+            '[1, 2]',
+            '{broken',
+            json.dumps({'text': 'Дата', 'author': 'auth',
+                        'pub_date': '2020-13-45T10:00'}),
+            json.dumps({'text': 'Дата', 'author': 'auth',
+                        'pub_date': 'вчера'}),
+            json.dumps({'text': 'Последний', 'author': 'auth',
+                        'group': 'test-slug'}),
+        ]
+        out = self.import_file('jsonl', '\n'.join(lines))
+        self.assertIn('Imported 2 posts, skipped 4', out)
+        for number in (2, 3, 4, 5):
+            with self.subTest(number=number):
+                self.assertIn(f'Row {number} skipped', self.err.getvalue())
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 1)
+        self.assertEqual(TimelineEntry.objects.count(), 2)
+
+    def test_import_csv(self):
+        """import_posts загружает CSV, группа необязательна."""
+        self.import_file(
+            'csv', 'text,author,group\nБез группы,auth,\n'
+                   'С группой,auth,test-slug\nНет группы,auth,missing\n'
+        )
+        self.assertEqual(
+            sorted(Post.objects.values_list('text', flat=True)),
+            ['Без группы', 'С группой']
+        )
+
+
+class ExportPostsCommandTest(TestCase):
+    def test_export_posts_writes_gzipped_csv(self):
+        """export_posts выгружает посты автора в сжатый CSV."""
+        user = User.objects.create_user(username='auth')
+        other = User.objects.create_user(username='other')
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=user) for i in range(5)
+        )
+        Post.objects.create(text='Чужой пост', author=other)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'posts.csv.gz')
+            call_command('export_posts', author='auth', format='csv',
+                         gzip=True, chunk_size=2, output=path,
+                         stderr=StringIO())
+            with gzip.open(path, 'rt', encoding='utf-8') as export:
+                rows = list(csv.DictReader(export))
+        self.assertEqual([row['text'] for row in rows],
+                         [f'Пост {i}' for i in range(5)])
+        self.assertEqual({row['author'] for row in rows}, {'auth'})
+
+
+class RebuildTimelineCommandTest(TestCase):
+    def test_rebuild_timeline_restores_entries(self):
+        """rebuild_timeline заново заполняет ленту."""
+        user = User.objects.create_user(username='auth')
+        Post.objects.create(text='Пост', author=user)
+        TimelineEntry.objects.all().delete()
+        call_command('rebuild_timeline', stdout=StringIO())
+        self.assertEqual(
+            list(TimelineEntry.objects.values_list('text', flat=True)),
+            ['Пост']
+        )
+
+
+class BulkPostsCommandsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.target = Group.objects.create(
+            title='Новая группа', slug='new-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=self.user, group=self.group)
+            for i in range(7)
+        )
+        Post.objects.create(text='Чужой пост', author=self.other,
+                            group=self.group)
+
+    def test_move_posts_keeps_counters(self):
+        """move_posts переносит посты пачками и правит счетчики."""
+        out = StringIO()
+        call_command('move_posts', to_group='new-slug', author='auth',
+                     chunk_size=3, stdout=out)
+        self.assertIn('Moved 7 posts.', out.getvalue())
+        self.assertEqual(self.target.posts.count(), 7)
+        self.assertEqual(
+            dict(Group.objects.values_list('slug', 'posts_count')),
+            {'test-slug': 1, 'new-slug': 7}
+        )
+        self.assertEqual(
+            TimelineEntry.objects.filter(group_slug='new-slug').count(), 7
+        )
+
+    def test_move_posts_skips_hidden_group(self):
+        """Посты не переносятся в группу, ожидающую удаления."""
+        Group.objects.filter(pk=self.target.pk).update(is_hidden=True)
+        with self.assertRaisesMessage(CommandError,
+                                      'Target group not found.'):
+            call_command('move_posts', to_group='new-slug', author='auth',
+                         stdout=StringIO())
+        self.assertFalse(self.target.posts.exists())
+
+    def test_delete_posts_keeps_counters(self):
+        """delete_posts удаляет посты автора пачками."""
+        call_command('delete_posts', author='auth', chunk_size=3,
+                     stdout=StringIO())
+        self.assertEqual(
+            list(Post.objects.values_list('text', flat=True)), ['Чужой пост']
+        )
+        self.assertEqual(AuthorCounter.objects.get(user=self.user)
+                         .posts_count, 0)
+        self.assertEqual(Group.objects.get(pk=self.group.pk).posts_count, 1)
+        self.assertEqual(TimelineEntry.objects.count(), 1)
+        self.assertFalse(search_posts(Post.objects.all(), 'пост 1'))
+
+    def test_delete_posts_one_delete_per_chunk(self):
+        """delete_posts удаляет каждую пачку одним DELETE."""
+        with CaptureQueriesContext(connection) as queries:
+            call_command('delete_posts', author='auth', chunk_size=3,
+                         stdout=StringIO())
+        self.assertEqual(len([
+            query for query in queries
+            if query['sql'].startswith('DELETE FROM "posts_post"')
+        ]), 3)
+
+
+class DeletionCommandsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=self.user, group=self.group)
+            for i in range(5)
+        )
+        Post.objects.create(text='Чужой пост', author=self.other,
+                            group=self.group)
+
+    def get_pages(self) -> dict:
+        """Страницы, на которых могут появиться посты автора."""
+        post = Post.objects.get(text='Пост 0')
+        urls = {
+            'index': reverse('posts:index'),
+            'search': reverse('posts:search') + '?q=пост',
+            'api': reverse('posts:api_index'),
+            'detail': reverse('posts:post_detail', args=[post.pk]),
+            'profile': reverse('posts:profile', args=[self.other.username]),
+        }
+        return {
+            page: self.client.get(url).content.decode()
+            for page, url in urls.items()
+        }
+
+    def test_posts_of_hidden_user_and_group_not_shown(self):
+        """Посты скрытых пользователя и группы сразу пропадают с сайта."""
+        for page, content in self.get_pages().items():
+            with self.subTest(page=page):
+                if page != 'profile':
+                    self.assertIn('Пост 0', content)
+        call_command('schedule_deletion', user='auth', stdout=StringIO())
+        pages = self.get_pages()
+        for page, content in pages.items():
+            with self.subTest(page=page):
+                self.assertNotIn('Пост 0', content)
+        self.assertIn('Чужой пост', pages['index'])
+        self.assertIn('Чужой пост', pages['profile'])
+        call_command('schedule_deletion', group='test-slug',
+                     stdout=StringIO())
+        pages = self.get_pages()
+        for page in ('index', 'profile'):
+            with self.subTest(page=page):
+                self.assertNotIn('Чужой пост', pages[page])
+        self.assertFalse(TimelineEntry.objects.exists())
+
+    def test_progress_committed_with_chunk(self):
+        """posts_done сохраняется в одной транзакции с пачкой."""
+        call_command('schedule_deletion', user='auth', stdout=StringIO())
+        deletion = PendingDeletion.objects.get()
+        save = PendingDeletion.save
+        calls = []
+
+        def failing_save(instance, *args, **kwargs):
+            calls.append(instance)
+            if len(calls) == 2:
+                raise RuntimeError('Disk full')
+            save(instance, *args, **kwargs)
+
+        with mock.patch.object(PendingDeletion, 'save', failing_save):
+            with self.assertRaises(RuntimeError):
+                process_deletion(deletion, chunk_size=2)
+        self.assertEqual(PendingDeletion.objects.get().posts_done, 2)
+        self.assertEqual(Post.objects.filter(author=self.user).count(), 3)
+
+    def test_user_is_hidden_then_deleted_in_batches(self):
+        """Пользователь сначала скрыт, затем удален вместе с постами."""
+        call_command('schedule_deletion', user='auth', stdout=StringIO())
+        self.assertFalse(User.objects.get(pk=self.user.pk).is_active)
+        self.assertEqual(
+            self.client.get(f'/profile/{self.user.username}/').status_code,
+            404
+        )
+        call_command('process_deletions', chunk_size=2, stdout=StringIO())
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        self.assertEqual(
+            list(Post.objects.values_list('text', flat=True)), ['Чужой пост']
+        )
+        self.assertEqual(Group.objects.get(pk=self.group.pk).posts_count, 1)
+        self.assertFalse(PendingDeletion.objects.exists())
+
+    def test_group_deletion_resumes_from_progress(self):
+        """Прерванное удаление группы продолжается с места остановки."""
+        call_command('schedule_deletion', group='test-slug',
+                     stdout=StringIO())
+        self.assertEqual(
+            self.client.get('/group/test-slug/').status_code, 404
+        )
+        deletion = PendingDeletion.objects.get()
+        Post.objects.filter(
+            pk__in=Post.objects.order_by('pk').values('pk')[:2]
+        ).update(group=None)
+        deletion.posts_done = 2
+        deletion.save()
+        out = StringIO()
+        call_command('process_deletions', chunk_size=3, stdout=out)
+        self.assertIn('6 posts done', out.getvalue())
+        self.assertFalse(Group.objects.exists())
+        self.assertEqual(Post.objects.count(), 6)
+        self.assertEqual(TimelineEntry.objects.count(), 6)
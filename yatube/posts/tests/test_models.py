@@ -1,6 +1,14 @@
-from django.test import TestCase
+from io import StringIO
+from unittest import mock
 
-from posts.models import Group, Post, User
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.query import QuerySet
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from posts.models import AuthorCounter, Group, Post, TimelineEntry, User
+from posts.paginators import BACKWARD, FORWARD, CursorPaginator
 
 
 class PostsAppModelTest(TestCase):
@@ -27,3 +35,170 @@ class PostsAppModelTest(TestCase):
         for model_name, object in model_objects:
             with self.subTest(model_name=model_name):
                 self.assertEqual(object[0], object[1])
+
+
+class PostsCountersTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        cls.other_group = Group.objects.create(title='Другая', slug='other')
+
+    def check_counters(self, author_count, group_count, other_group_count):
+        self.assertEqual(
+            AuthorCounter.objects.get(user=self.user).posts_count,
+            author_count
+        )
+        self.assertEqual(
+            Group.objects.get(pk=self.group.pk).posts_count, group_count
+        )
+        self.assertEqual(
+            Group.objects.get(pk=self.other_group.pk).posts_count,
+            other_group_count
+        )
+
+    def test_counters_follow_post_changes(self):
+        """Счетчики постов меняются при создании, переносе и удалении."""
+        post = Post.objects.create(
+            author=self.user, text='Текст', group=self.group
+        )
+        Post.objects.bulk_create(
+            Post(author=self.user, text='Текст', group=self.group)
+            for _ in range(2)
+        )
+        self.check_counters(3, 3, 0)
+        post = Post.objects.get(pk=post.pk)
+        post.group = self.other_group
+        post.save()
+        self.check_counters(3, 2, 1)
+        post.delete()
+        self.check_counters(2, 2, 0)
+
+    def test_first_post_race_keeps_counter(self):
+        """Одновременный первый пост автора не ломает счетчик."""
+        AuthorCounter.objects.create(user=self.user, posts_count=1)
+        update = QuerySet.update
+        calls = []
+
+        def update_before_rival(queryset, **kwargs):
+            # Other writer commits its counter right after first UPDATE.
+            calls.append(kwargs)
+            return 0 if len(calls) == 1 else update(queryset, **kwargs)
+
+        with mock.patch.object(QuerySet, 'update', update_before_rival):
+            AuthorCounter.change_posts_count(self.user.pk, 1)
+        self.assertEqual(
+            AuthorCounter.objects.get(user=self.user).posts_count, 2
+        )
+
+    def test_recount_posts_repairs_counters(self):
+        """Команда recount_posts чинит рассинхронизированные счетчики."""
+        Post.objects.create(author=self.user, text='Текст', group=self.group)
+        Group.objects.update(posts_count=42)
+        AuthorCounter.objects.update(posts_count=42)
+        call_command('recount_posts', stdout=StringIO())
+        self.check_counters(1, 1, 0)
+
+
+class PostsFeedQueryPlanTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Текст {i}', group=cls.group)
+            for i in range(15)
+        )
+
+    def get_plan(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def get_feed_queries(self, posts):
+        paginator = CursorPaginator(posts, 10)
+        return [
+            paginator.object_list[:10],
+            paginator.get_cursor_queryset(FORWARD, timezone.now(), 10)[:11],
+            paginator.get_cursor_queryset(BACKWARD, timezone.now(), 10)[:11],
+        ]
+
+    def test_feed_queries_use_indexes(self):
+        """Запросы лент идут по индексу без сортировки во временном дереве."""
+        feeds = {
+            'index': Post.objects.visible().select_related('author',
+                                                           'group'),
+            'group_list': self.group.posts.visible().select_related('author'),
+            'profile': self.user.posts.visible().select_related('group'),
+        }
+        for feed, posts in feeds.items():
+            for queryset in self.get_feed_queries(posts):
+                plan = self.get_plan(queryset)
+                with self.subTest(feed=feed, plan=plan):
+                    self.assertFalse(
+                        [step for step in plan if 'TEMP B-TREE' in step]
+                    )
+                    self.assertFalse([
+                        step for step in plan
+                        if 'posts_post' in step and 'INDEX' not in step
+                    ])
+
+
+@override_settings(TIMELINE_SIZE=3)
+class TimelineTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    def create_post(self, text: str) -> Post:
+        return Post.objects.create(text=text, author=self.user,
+                                   group=self.group)
+
+    def timeline_texts(self) -> list:
+        return list(TimelineEntry.objects.values_list('text', flat=True))
+
+    def test_timeline_keeps_latest_posts(self):
+        """Лента хранит только последние посты, новые первыми."""
+        for i in range(5):
+            self.create_post(f'Пост {i}')
+        self.assertEqual(self.timeline_texts(), ['Пост 4', 'Пост 3',
+                                                 'Пост 2'])
+
+    def test_timeline_follows_edit_and_delete(self):
+        """Правка обновляет запись, удаление подтягивает старый пост."""
+        posts = [self.create_post(f'Пост {i}') for i in range(4)]
+        posts[3].text = 'Исправленный пост'
+        posts[3].save()
+        posts[2].delete()
+        self.assertEqual(self.timeline_texts(),
+                         ['Исправленный пост', 'Пост 1', 'Пост 0'])
+
+    def test_timeline_copies_author_and_group_changes(self):
+        """Новые имя автора и слаг группы попадают в ленту."""
+        group = Group.objects.create(title='Группа', slug='slug',
+                                     description='Описание')
+        Post.objects.create(text='Пост', author=self.user, group=group)
+        self.user.first_name = 'Лев'
+        self.user.save()
+        group.slug = 'new-slug'
+        group.save()
+        entry = TimelineEntry.objects.get()
+        self.assertEqual(entry.author.get_full_name(), 'Лев')
+        self.assertEqual(entry.group.slug, 'new-slug')
+        group.delete()
+        self.assertIsNone(TimelineEntry.objects.get().group)
+
+    def test_bulk_created_posts_get_into_timeline(self):
+        """Посты из bulk_create тоже попадают в ленту."""
+        self.create_post('Старый пост')
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=self.user) for i in range(3)
+        )
+        self.assertEqual(len(self.timeline_texts()), 3)
+        self.assertNotIn('Старый пост', self.timeline_texts())
@@ -1,6 +1,13 @@
-from django.test import TestCase, Client
-from django.urls import reverse
+from django.core.cache import cache, caches
+from django.test import TestCase, Client, override_settings
+from django.urls import get_resolver, reverse
 from http import HTTPStatus
+from unittest import mock
+
+from core.middleware.query_budget import (QueryBudgetExceeded,
+                                          QueryBudgetMiddleware,
+                                          QueryRecorder,
+                                          collect_query_budgets)
 
 from posts.models import Post, Group, User
 
@@ -80,3 +87,66 @@ class PostsAppURLTests(TestCase):
             with self.subTest(address=address):
                 response = self.authorized_client.get(address)
                 self.assertTemplateUsed(response, template)
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class PostsAppQueryBudgetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='HasNoName')
+        cls.group = Group.objects.create(
+            title='Название тестовой группы',
+            slug='test-slug',
+            description='Описание тестовой группы'
+        )
+        Post.objects.bulk_create(
+            Post(text=f'Тестовый текст {i}', author=cls.user, group=cls.group)
+            for i in range(15)
+        )
+        cls.post = Post.objects.first()
+
+    def setUp(self):
+        cache.clear()
+        caches['template_fragments'].clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_views_fit_query_budgets(self):
+        """Страницы укладываются в бюджет запросов и не делают N+1."""
+        requests = [
+            ('get', reverse('posts:index'), {}),
+            ('get', reverse('posts:group_list', args=[self.group.slug]), {}),
+            ('get', reverse('posts:profile', args=[self.user.username]), {}),
+            ('get', reverse('posts:post_detail', args=[self.post.id]), {}),
+            ('get', reverse('posts:post_edit', args=[self.post.id]), {}),
+            ('get', reverse('posts:post_create'), {}),
+            ('post', reverse('posts:post_create'),
+             {'text': 'Новый пост', 'group': self.group.id}),
+            ('post', reverse('posts:post_edit', args=[self.post.id]),
+             {'text': 'Измененный пост', 'group': self.group.id}),
+        ]
+        for client in (self.guest_client, self.authorized_client):
+            for method, url, data in requests:
+                with self.subTest(url=url, method=method):
+                    cache.clear()
+                    caches['template_fragments'].clear()
+                    getattr(client, method)(url, data)
+
+    def test_repeated_query_is_reported(self):
+        """Повторяющийся запрос одной формы считается N+1."""
+        recorder = QueryRecorder()
+        recorder.statements = [
+            f'SELECT * FROM "posts_group" WHERE "id" = {i}' for i in range(5)
+        ]
+        with self.assertRaises(QueryBudgetExceeded):
+            QueryBudgetMiddleware(None).check('posts:index', recorder)
+
+    def test_budgets_collected_once(self):
+        """Бюджеты собираются из urls один раз, а не на каждый запрос."""
+        collect_query_budgets.cache_clear()
+        with mock.patch('core.middleware.query_budget.get_resolver',
+                        wraps=get_resolver) as resolver:
+            for _ in range(3):
+                self.guest_client.get(reverse('posts:index'))
+        self.assertEqual(resolver.call_count, 1)
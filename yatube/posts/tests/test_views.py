@@ -1,8 +1,21 @@
+import gzip
+import json
+from unittest import mock
+
 from django import forms
-from django.test import TestCase, Client
+from django.core.cache import cache, caches
+from django.db import connection, transaction
+from django.test import Client, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from posts.models import Post, Group, User
+from posts import lookups, middleware
+from posts.cache import (FEED_GENERATION_KEY, get_feed_generation, group_feed,
+                         index_feed, make_feed_key, post_feed, profile_feed)
+from posts.deletion import schedule_deletion
+from posts.middleware import resolve_path
+from posts.models import Post, Group, TimelineEntry, User
+from posts.paginators import CursorPaginator
 
 
 class PostsAppViewTest(TestCase):
@@ -22,6 +35,7 @@ class PostsAppViewTest(TestCase):
         )
 
     def setUp(self):
+        cache.clear()
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
 
@@ -151,6 +165,9 @@ class PaginatorViewsTest(TestCase):
         ]
         Post.objects.bulk_create(new_posts)
 
+    def setUp(self):
+        cache.clear()
+
     def test_first_page_contains_ten_records(self):
         """На первой странице 10 постов."""
         view_names = [
@@ -174,3 +191,666 @@ class PaginatorViewsTest(TestCase):
             with self.subTest(view=view):
                 response = self.client.get(view + '?page=2')
                 self.assertEqual(len(response.context['page_obj']), 3)
+
+    def test_cursor_pages_walk_whole_feed(self):
+        """Курсорная пагинация проходит ленту без пропусков и повторов."""
+        view_names = [
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.user.username]),
+        ]
+        for view in view_names:
+            with self.subTest(view=view):
+                first_page = self.client.get(view).context['page_obj']
+                next_page = self.client.get(
+                    view, {'cursor': first_page.next_cursor}
+                ).context['page_obj']
+                self.assertEqual(len(next_page), 3)
+                self.assertFalse(next_page.has_next())
+                previous_page = self.client.get(
+                    view, {'cursor': next_page.previous_cursor}
+                ).context['page_obj']
+                self.assertEqual(
+                    [post.id for post in previous_page],
+                    [post.id for post in first_page]
+                )
+                walked_ids = [
+                    post.id for post in list(first_page) + list(next_page)
+                ]
+                self.assertEqual(len(set(walked_ids)), 13)
+
+    def test_elided_page_range(self):
+        """Длинная лента показывает только края и окно вокруг страницы."""
+        paginator = CursorPaginator(Post.objects.all(), 10, count=1000)
+        self.assertEqual(
+            list(paginator.get_elided_page_range(50)),
+            [1, '…', 48, 49, 50, 51, 52, '…', 100]
+        )
+        self.assertEqual(
+            list(paginator.get_elided_page_range(2)),
+            [1, 2, 3, 4, '…', 100]
+        )
+
+    def test_cursor_page_does_not_count_posts(self):
+        """Курсорная страница рендерится без COUNT(*) по ленте."""
+        first_page = self.client.get(reverse('posts:index')).context[
+            'page_obj'
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(
+                reverse('posts:index'), {'cursor': first_page.next_cursor}
+            )
+        self.assertFalse([
+            query for query in queries if 'COUNT(' in query['sql']
+        ])
+
+    def test_first_pages_of_index_read_timeline(self):
+        """Первые страницы главной читаются из ленты без JOIN."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('posts:index'))
+        self.assertEqual(len(response.context['page_obj']), 10)
+        self.assertFalse([
+            query for query in queries if 'JOIN' in query['sql']
+        ])
+        self.assertFalse([
+            query for query in queries
+            if 'COUNT(' in query['sql'] and '"posts_post"' in query['sql']
+        ])
+        TimelineEntry.objects.all().delete()
+        response = self.client.get(reverse('posts:index'), {'page': 2})
+        self.assertEqual(len(response.context['page_obj']), 3)
+
+    def test_broken_cursor_returns_first_page(self):
+        """Битый курсор отдает первую страницу."""
+        response = self.client.get(reverse('posts:index'), {'cursor': '!!'})
+        self.assertEqual(response.context['page_obj'].number, 1)
+
+
+class FeedCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='HasNoName')
+        cls.group = Group.objects.create(
+            title='Название тестовой группы',
+            slug='test-slug',
+            description='Описание тестовой группы'
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый текст',
+            author=cls.user,
+            group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.feeds = [
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.user.username]),
+        ]
+
+    def test_anonymous_feed_served_from_cache(self):
+        """Повторный анонимный запрос ленты не рендерит шаблон."""
+        for url in self.feeds:
+            with self.subTest(url=url):
+                first = self.client.get(url)
+                Post.objects.filter(pk=self.post.pk).update(text='Тихо')
+                second = self.client.get(url)
+                self.assertIsNone(second.context)
+                self.assertEqual(second.content, first.content)
+                Post.objects.filter(pk=self.post.pk).update(
+                    text=self.post.text
+                )
+
+    def test_cache_dropped_after_author_name_change(self):
+        """Смена имени автора сбрасывает кэш его лент."""
+        for url in self.feeds:
+            self.client.get(url)
+        self.user.first_name = 'Новое'
+        self.user.last_name = 'Имя'
+        self.user.save()
+        for url in self.feeds:
+            with self.subTest(url=url):
+                self.assertContains(self.client.get(url), 'Новое Имя')
+
+    def test_cache_dropped_after_group_rename(self):
+        """Переименование группы сбрасывает кэш главной и профиля."""
+        urls = [reverse('posts:index'),
+                reverse('posts:profile', args=[self.user.username])]
+        etags = {url: self.authorized_client.get(url)['ETag'] for url in urls}
+        for url in urls:
+            self.client.get(url)
+        group = Group.objects.get(pk=self.group.pk)
+        group.slug = 'new-slug'
+        group.save()
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertContains(response, '/group/new-slug/')
+                self.assertNotContains(response, '/group/test-slug/')
+                response = self.authorized_client.get(
+                    url, HTTP_IF_NONE_MATCH=etags[url]
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_cache_dropped_after_create_and_edit(self):
+        """Создание и редактирование поста сбрасывает кэш лент."""
+        for url in self.feeds:
+            self.client.get(url)
+        self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Новый пост', 'group': self.group.id}
+        )
+        for url in self.feeds:
+            with self.subTest(url=url):
+                self.assertContains(self.client.get(url), 'Новый пост')
+        self.authorized_client.post(
+            reverse('posts:post_edit', args=[self.post.id]),
+            data={'text': 'Измененный пост', 'group': self.group.id}
+        )
+        for url in self.feeds:
+            with self.subTest(url=url):
+                self.assertContains(
+                    self.client.get(url), 'Измененный пост'
+                )
+
+
+class FeedInvalidationCommitTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_feeds_bumped_again_after_commit(self):
+        """Поколение ленты меняется еще раз после коммита."""
+        user = User.objects.create_user(username='HasNoName')
+        with transaction.atomic():
+            Post.objects.create(text='Текст', author=user)
+            # Reader caching pre-commit page would use this generation.
+            generation = get_feed_generation(index_feed())
+        self.assertNotEqual(get_feed_generation(index_feed()), generation)
+
+
+class AnonymousPageCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='HasNoName')
+        cls.group = Group.objects.create(title='Группа', slug='page-cache')
+        cls.post = Post.objects.create(text='Тестовый текст', author=cls.user,
+                                       group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        # Misses remembered before rollback of a delete carry no version.
+        for objects in (lookups.posts, lookups.groups, lookups.users):
+            objects.cache.local.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.url = reverse('posts:post_detail', args=[self.post.id])
+
+    def test_page_served_without_queries(self):
+        """Повторный анонимный запрос не обращается к базе."""
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.context)
+        self.assertEqual(len(queries), 0)
+
+    def test_public_headers_for_proxies(self):
+        """Анонимная страница публичная и зависит от cookie."""
+        for _ in range(2):
+            response = self.client.get(self.url)
+            self.assertIn('public', response['Cache-Control'])
+            self.assertIn('max-age=60', response['Cache-Control'])
+            self.assertIn('Cookie', response['Vary'])
+
+    def test_logged_in_user_bypasses_cache(self):
+        """Авторизованный пользователь получает свою приватную страницу."""
+        self.client.get(self.url)
+        response = self.authorized_client.get(self.url)
+        self.assertIsNotNone(response.context)
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_cached_page_answers_conditional_get(self):
+        """Закэшированная страница отвечает 304 на If-None-Match."""
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_page_follows_author_and_group(self):
+        """Страница поста обновляется вслед за автором и группой."""
+        self.client.get(self.url)
+        Post.objects.create(text='Второй пост', author=self.user)
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = 'Новое'
+        user.save()
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'Новое название'
+        group.save()
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Новое')
+        self.assertContains(response, 'Новое название')
+        self.assertEqual(
+            response.context['post'].author.posts_counter.posts_count, 2
+        )
+
+    def test_path_resolved_once(self):
+        """Путь страницы разбирается middleware один раз."""
+        resolve_path.cache_clear()
+        with mock.patch('posts.middleware.resolve',
+                        wraps=middleware.resolve) as resolve:
+            for _ in range(3):
+                self.client.get(self.url)
+                self.authorized_client.get(self.url)
+        self.assertEqual(resolve.call_count, 1)
+
+    def test_page_dropped_after_edit_and_delete(self):
+        """Правка и удаление поста сбрасывают кэш его страницы."""
+        self.client.get(self.url)
+        self.authorized_client.post(
+            reverse('posts:post_edit', args=[self.post.id]),
+            data={'text': 'Измененный пост'}
+        )
+        self.assertContains(self.client.get(self.url), 'Измененный пост')
+        Post.objects.filter(pk=self.post.pk).delete()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class ObjectCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='HasNoName')
+        cls.group = Group.objects.create(title='Группа', slug='objects')
+        cls.post = Post.objects.create(text='Тестовый текст', author=cls.user,
+                                       group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        for objects in (lookups.posts, lookups.groups, lookups.users):
+            objects.cache.local.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def get_table_queries(self, url: str, table: str) -> list:
+        with CaptureQueriesContext(connection) as queries:
+            self.authorized_client.get(url)
+        return [query['sql'] for query in queries
+                if f'FROM "{table}"' in query['sql']]
+
+    def test_lookups_served_from_cache(self):
+        """Повторные поиск группы, автора и поста не идут в базу."""
+        lookups_by_table = {
+            reverse('posts:group_list', args=[self.group.slug]):
+                'posts_group',
+            reverse('posts:profile', args=[self.user.username]): 'auth_user',
+            reverse('posts:post_edit', args=[self.post.id]): 'posts_post',
+        }
+        for url, table in lookups_by_table.items():
+            with self.subTest(url=url):
+                self.authorized_client.get(url)
+                self.assertEqual(self.get_table_queries(url, table), [])
+
+    def test_saved_objects_written_through(self):
+        """Сохраненный объект сразу виден из кэша."""
+        lookups.groups.get(self.group.slug)
+        self.group.title = 'Новое название'
+        self.group.save()
+        self.assertEqual(lookups.groups.get(self.group.slug).title,
+                         'Новое название')
+        self.assertEqual(self.get_table_queries(
+            reverse('posts:group_list', args=[self.group.slug]),
+            'posts_group'
+        ), [])
+
+    def test_cached_post_follows_author_and_group(self):
+        """Пост из кэша не хранит старые имена автора и группы."""
+        lookups.posts.get(self.post.pk)
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = 'Новое'
+        user.save()
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'Новое название'
+        group.save()
+        post = lookups.posts.get(self.post.pk)
+        self.assertEqual(post.author.first_name, 'Новое')
+        self.assertEqual(post.group.title, 'Новое название')
+
+    def test_missing_object_remembered(self):
+        """Отсутствующий объект кэшируется до его создания."""
+        url = reverse('posts:group_list', args=['missing'])
+        self.assertEqual(self.authorized_client.get(url).status_code, 404)
+        self.assertEqual(self.get_table_queries(url, 'posts_group'), [])
+        Group.objects.create(title='Появилась', slug='missing')
+        self.assertEqual(self.authorized_client.get(url).status_code, 200)
+
+    def test_missing_objects_leave_no_generations(self):
+        """Запросы несуществующих объектов не оставляют поколений лент."""
+        urls = [
+            reverse('posts:group_list', args=['missing']),
+            reverse('posts:profile', args=['missing']),
+            reverse('posts:post_detail', args=[10 ** 6]),
+        ]
+        for client in (self.client, self.authorized_client):
+            for url in urls:
+                with self.subTest(url=url):
+                    self.assertEqual(client.get(url).status_code, 404)
+        self.assertIsNone(lookups.groups.get('missing-lookup'))
+        feeds = [group_feed('missing'), profile_feed('missing'),
+                 post_feed(10 ** 6), group_feed('missing-lookup')]
+        self.assertEqual(cache.get_many([
+            make_feed_key(FEED_GENERATION_KEY, feed) for feed in feeds
+        ]), {})
+
+    def test_deleted_and_hidden_objects_dropped(self):
+        """Удаление и скрытие объектов сбрасывают кэш."""
+        post_url = reverse('posts:post_detail', args=[self.post.id])
+        group_url = reverse('posts:group_list', args=[self.group.slug])
+        self.authorized_client.get(post_url)
+        self.authorized_client.get(group_url)
+        Post.objects.filter(pk=self.post.pk).delete()
+        schedule_deletion(self.group)
+        for url in (post_url, group_url):
+            with self.subTest(url=url):
+                response = self.authorized_client.get(url)
+                self.assertEqual(response.status_code, 404)
+
+    def test_counters_and_renames_stay_fresh(self):
+        """Счетчики и переименования не отдаются из старого кэша."""
+        lookups.groups.get(self.group.slug)
+        Post.objects.create(text='Еще пост', author=self.user,
+                            group=self.group)
+        self.assertEqual(lookups.groups.get(self.group.slug).posts_count, 2)
+        old_url = reverse('posts:profile', args=[self.user.username])
+        self.authorized_client.get(old_url)
+        user = User.objects.get(pk=self.user.pk)
+        user.username = 'renamed'
+        user.save()
+        self.assertEqual(self.authorized_client.get(old_url).status_code, 404)
+
+
+class ObjectWriteThroughTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        for objects in (lookups.posts, lookups.groups, lookups.users):
+            objects.cache.local.clear()
+        self.group = Group.objects.create(title='Группа', slug='objects')
+
+    def test_committed_object_written_through(self):
+        """Сохраненный объект попадает в кэш после коммита."""
+        with CaptureQueriesContext(connection) as queries:
+            group = lookups.groups.get(self.group.slug)
+        self.assertEqual(group.title, 'Группа')
+        self.assertEqual(len(queries), 0)
+
+    def test_rolled_back_object_not_cached(self):
+        """Откаченное сохранение не попадает в кэш."""
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                self.group.title = 'Откат'
+                self.group.save()
+                raise RuntimeError
+        self.assertEqual(lookups.groups.get(self.group.slug).title,
+                         'Группа')
+
+
+class PostFragmentCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='HasNoName')
+        cls.post = Post.objects.create(text='Тестовый текст', author=cls.user)
+
+    def setUp(self):
+        caches['template_fragments'].clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_post_card_cached_until_post_modified(self):
+        """Карточка поста берется из кэша, пока пост не изменен."""
+        self.authorized_client.get(reverse('posts:index'))
+        Post.objects.filter(pk=self.post.pk).update(text='Тихая правка')
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertContains(response, 'Тестовый текст')
+        post = Post.objects.get(pk=self.post.pk)
+        post.save()
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertContains(response, 'Тихая правка')
+
+    def test_post_card_follows_author_and_group_renames(self):
+        """Карточка поста обновляется после переименования автора и группы."""
+        group = Group.objects.create(title='Группа', slug='old-slug')
+        post = Post.objects.get(pk=self.post.pk)
+        post.group = group
+        post.save()
+        self.authorized_client.get(reverse('posts:index'))
+        # Renames leave post.modified alone, the key must see them.
+        user = User.objects.get(pk=self.user.pk)
+        user.username = 'renamed'
+        user.save()
+        group.slug = 'new-slug'
+        group.save()
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertContains(response, '/profile/renamed/')
+        self.assertContains(response, '/group/new-slug/')
+
+
+class SearchViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='HasNoName')
+        cls.other_user = User.objects.create_user(username='Other')
+        cls.group = Group.objects.create(
+            title='Название тестовой группы',
+            slug='test-slug',
+            description='Описание тестовой группы'
+        )
+        cls.post = Post.objects.create(
+            text='Пушкин написал стихотворение',
+            author=cls.user,
+            group=cls.group
+        )
+        Post.objects.bulk_create([
+            Post(text='Стихотворение Лермонтова', author=cls.other_user),
+            Post(text='Проза без рифмы', author=cls.user),
+        ])
+
+    def search(self, **params):
+        response = self.client.get(reverse('posts:search'), params)
+        return [post.text for post in response.context['page_obj']]
+
+    def test_search_finds_posts_by_words(self):
+        """Поиск находит посты по словам и префиксу последнего слова."""
+        self.assertEqual(
+            sorted(self.search(q='стихотворение')),
+            ['Пушкин написал стихотворение', 'Стихотворение Лермонтова']
+        )
+        self.assertEqual(self.search(q='пушкин стихо'),
+                         ['Пушкин написал стихотворение'])
+        self.assertEqual(self.search(q='"OR NOT*'), [])
+
+    def test_search_filters_by_group_and_author(self):
+        """Поиск ограничивается группой и автором."""
+        self.assertEqual(
+            self.search(q='стихотворение', group=self.group.slug),
+            ['Пушкин написал стихотворение']
+        )
+        self.assertEqual(
+            self.search(q='стихотворение', author=self.other_user.username),
+            ['Стихотворение Лермонтова']
+        )
+
+    def test_search_index_follows_changes(self):
+        """Индекс поиска следит за изменением и удалением постов."""
+        Post.objects.filter(pk=self.post.pk).update(text='Басня Крылова')
+        self.assertEqual(self.search(q='пушкин'), [])
+        self.assertEqual(self.search(q='басня'), ['Басня Крылова'])
+        Post.objects.filter(pk=self.post.pk).delete()
+        self.assertEqual(self.search(q='басня'), [])
+
+
+class FeedApiTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='HasNoName')
+        cls.group = Group.objects.create(
+            title='Название тестовой группы',
+            slug='test-slug',
+            description='Описание тестовой группы'
+        )
+        Post.objects.bulk_create(
+            Post(text=f'Тестовый текст {i}', author=cls.user, group=cls.group)
+            for i in range(13)
+        )
+
+    def test_api_feeds_walk_by_cursor(self):
+        """JSON ленты отдаются страницами по курсору."""
+        urls = [
+            reverse('posts:api_index'),
+            reverse('posts:api_group_list', args=[self.group.slug]),
+            reverse('posts:api_profile', args=[self.user.username]),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                first = self.client.get(url).json()
+                self.assertEqual(len(first['results']), 10)
+                self.assertIsNone(first['previous'])
+                second = self.client.get(
+                    url, {'cursor': first['next']}
+                ).json()
+                self.assertEqual(len(second['results']), 3)
+                self.assertIsNone(second['next'])
+                back = self.client.get(
+                    url, {'cursor': second['previous']}
+                ).json()
+                self.assertEqual(back['results'], first['results'])
+
+    def test_api_returns_only_requested_fields(self):
+        """Параметр fields ограничивает поля в ответе."""
+        response = self.client.get(
+            reverse('posts:api_index'), {'fields': 'id,author', 'limit': 2}
+        ).json()
+        self.assertEqual(
+            response['results'][0],
+            {'id': response['results'][0]['id'], 'author': 'HasNoName'}
+        )
+        self.assertEqual(len(response['results']), 2)
+
+    def test_api_streams_whole_feed(self):
+        """С all=1 лента целиком отдается потоком."""
+        response = self.client.get(
+            reverse('posts:api_index'), {'all': '1', 'fields': 'id'}
+        )
+        self.assertTrue(response.streaming)
+        rows = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(
+            sorted(row['id'] for row in rows),
+            sorted(Post.objects.values_list('id', flat=True))
+        )
+
+    def test_api_unknown_group_is_404(self):
+        """Несуществующая группа дает 404."""
+        response = self.client.get(
+            reverse('posts:api_group_list', args=['missing'])
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='HasNoName')
+        cls.group = Group.objects.create(
+            title='Название тестовой группы',
+            slug='test-slug',
+            description='Описание тестовой группы'
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый текст',
+            author=cls.user,
+            group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_unchanged_pages_answer_not_modified(self):
+        """Неизмененная страница отвечает 304, после правки поста 200."""
+        urls = [
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.user.username]),
+            reverse('posts:post_detail', args=[self.post.id]),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.authorized_client.post(
+                    reverse('posts:post_edit', args=[self.post.id]),
+                    data={'text': url, 'group': self.group.id}
+                )
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+
+    def test_etag_depends_on_viewer(self):
+        """У гостя и автора разные ETag одной страницы."""
+        url = reverse('posts:post_detail', args=[self.post.id])
+        self.assertNotEqual(
+            self.client.get(url)['ETag'],
+            self.authorized_client.get(url)['ETag']
+        )
+
+    def test_post_detail_ignores_if_modified_since(self):
+        """If-Modified-Since без ETag не дает 304 чужой версии страницы."""
+        url = reverse('posts:post_detail', args=[self.post.id])
+        response = self.client.get(url)
+        self.assertFalse(response.has_header('Last-Modified'))
+        response = self.authorized_client.get(
+            url, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT'
+        )
+        self.assertEqual(response.status_code, 200)
+
+
+class ExportViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='HasNoName')
+        cls.group = Group.objects.create(
+            title='Название тестовой группы',
+            slug='test-slug',
+            description='Описание тестовой группы'
+        )
+        Post.objects.create(text='В группе', author=cls.user, group=cls.group)
+        Post.objects.create(text='Без группы', author=cls.user)
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_export_needs_login(self):
+        """Гость перенаправляется на страницу входа."""
+        response = self.client.get(reverse('posts:export'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_export_streams_group_posts(self):
+        """Выгрузка группы отдается потоком JSONL."""
+        response = self.authorized_client.get(
+            reverse('posts:export'), {'group': self.group.slug}
+        )
+        self.assertTrue(response.streaming)
+        rows = [json.loads(line) for line in b''.join(
+            response.streaming_content
+        ).decode().splitlines()]
+        self.assertEqual([row['text'] for row in rows], ['В группе'])
+
+    def test_export_gzip(self):
+        """С gzip=1 выгрузка сжимается на лету."""
+        response = self.authorized_client.get(
+            reverse('posts:export'), {'format': 'csv', 'gzip': '1'}
+        )
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        content = gzip.decompress(b''.join(response.streaming_content))
+        self.assertEqual(len(content.decode().splitlines()), 3)
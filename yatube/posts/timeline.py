@@ -0,0 +1,128 @@
+from typing import List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q, Subquery
+
+from .models import Group, Post, TimelineEntry, User
+
+
+def get_timeline_size() -> int:
+    return getattr(settings, 'TIMELINE_SIZE', 1000)
+
+
+def make_entry(post: Post) -> TimelineEntry:
+    """Entry of post, author and group must be selected along."""
+    group: Optional[Group] = post.group
+    return TimelineEntry(
+        post_id=post.pk,
+        text=post.text,
+        pub_date=post.pub_date,
+        modified=post.modified,
+        author_id=post.author_id,
+        author_username=post.author.username,
+        author_full_name=post.author.get_full_name(),
+        group_id=post.group_id,
+        group_slug=group.slug if group else '',
+        group_title=group.title if group else '',
+    )
+
+
+def newer_or_same(entry: TimelineEntry) -> Q:
+    return Q(pub_date__gt=entry.pub_date) | Q(pub_date=entry.pub_date,
+                                              pk__gte=entry.pk)
+
+
+def get_boundary() -> Optional[TimelineEntry]:
+    """Oldest entry of full timeline, older posts do not get in."""
+    size: int = get_timeline_size()
+    entries: List[TimelineEntry] = list(
+        TimelineEntry.objects.only('pub_date')[size - 1:size]
+    )
+    return entries[0] if entries else None
+
+
+def trim_timeline() -> None:
+    """Drop entries beyond size in one statement."""
+    TimelineEntry.objects.filter(pk__in=Subquery(
+        TimelineEntry.objects.values('pk')[get_timeline_size():]
+    )).delete()
+
+
+def push_post(post: Post, created: bool = False) -> None:
+    """Put new or edited post into timeline and cut it back to size.
+
+    Author and group of post are read from its cached relations, which
+    views fill anyway.
+    """
+    boundary: Optional[TimelineEntry] = get_boundary()
+    if not created:
+        TimelineEntry.objects.filter(pk=post.pk).delete()
+    if not post.is_visible or boundary is not None and (
+            post.pub_date, post.pk) < (boundary.pub_date, boundary.pk):
+        return
+    make_entry(post).save(force_insert=True)
+    if boundary is not None:
+        trim_timeline()
+
+
+def push_new_posts() -> None:
+    """Take in new posts of unknown ids, as bulk_create leaves them."""
+    boundary: Optional[TimelineEntry] = get_boundary()
+    if boundary is None:
+        rebuild_timeline()
+        return
+    posts = Post.objects.visible().filter(
+        newer_or_same(boundary), timeline_entry=None
+    ).select_related('author', 'group')
+    TimelineEntry.objects.bulk_create(make_entry(post) for post in posts)
+    trim_timeline()
+
+
+def fill_timeline() -> None:
+    """Pull in older posts up to size, after deletions or from scratch."""
+    missing: int = get_timeline_size() - TimelineEntry.objects.count()
+    if missing <= 0:
+        return
+    posts = Post.objects.visible().select_related(
+        'author', 'group'
+    ).order_by('-pub_date', '-id')
+    oldest: Optional[TimelineEntry] = TimelineEntry.objects.only(
+        'pub_date'
+    ).last()
+    if oldest is not None:
+        posts = posts.exclude(newer_or_same(oldest))
+    TimelineEntry.objects.bulk_create(
+        make_entry(post) for post in posts[:missing]
+    )
+
+
+def rebuild_timeline() -> None:
+    with transaction.atomic():
+        TimelineEntry.objects.all().delete()
+        fill_timeline()
+
+
+def update_author(user: User) -> None:
+    TimelineEntry.objects.filter(author_id=user.pk).update(
+        author_username=user.username,
+        author_full_name=user.get_full_name(),
+    )
+
+
+def update_group(group: Group) -> None:
+    TimelineEntry.objects.filter(group_id=group.pk).update(
+        group_slug=group.slug, group_title=group.title
+    )
+
+
+def hide_posts(**owner) -> None:
+    """Take out posts of author_id or group_id pending deletion."""
+    TimelineEntry.objects.filter(**owner).delete()
+    fill_timeline()
+
+
+def drop_group(group: Group) -> None:
+    TimelineEntry.objects.filter(group_id=group.pk).update(
+        group_id=None, group_slug='', group_title=''
+    )
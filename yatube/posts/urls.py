@@ -1,6 +1,8 @@
+from typing import Dict
+
 from django.urls import path
 
-from . import views
+from . import api, export, views
 
 
 app_name: str = 'posts'
@@ -12,4 +14,25 @@ urlpatterns = [
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path('create/', views.post_create, name='post_create'),
+    path('search/', views.search, name='search'),
+    path('api/posts/', api.index, name='api_index'),
+    path('api/group/<slug:slug>/', api.group_posts, name='api_group_list'),
+    path('api/profile/<str:username>/', api.profile, name='api_profile'),
+    path('export/', export.download, name='export'),
 ]
+
+# Most queries a request may run, logged in user and cold caches
+# included, checked by core.middleware.query_budget.
+query_budgets: Dict[str, int] = {
+    'index': 4,
+    'group_list': 4,
+    'profile': 4,
+    'post_detail': 4,
+    'post_edit': 16,
+    'post_create': 15,
+    'search': 4,
+    'api_index': 1,
+    'api_group_list': 2,
+    'api_profile': 2,
+    'export': 4,
+}
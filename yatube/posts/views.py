@@ -1,39 +1,88 @@
-from typing import Dict, Union
+from typing import Dict, List, Optional, Union
 
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.core.paginator import Page, Paginator
 from django.db.models.query import QuerySet
-from django.http import HttpResponse
-from django.shortcuts import render, get_object_or_404, redirect
+from django.http import Http404, HttpResponse, QueryDict
+from django.shortcuts import render, redirect
+from django.views.decorators.http import condition
 
-from .forms import PostForm
-from .models import Post, Group, User
+from core.sqlite import retry_on_locked
+
+from .cache import (cache_feed_page, feed_etag, get_feed_generation,
+                    group_feed, index_feed, make_etag, post_feed,
+                    profile_feed)
+from . import lookups
+from .forms import PostForm, SearchForm
+from .models import AuthorCounter, Post, Group, TimelineEntry, User
+from .paginators import (CursorPaginator, RankedPaginator, TimelinePaginator,
+                         estimate_count)
+from .search import search_posts
+from .timeline import get_timeline_size
 
 
 POSTS_ON_PAGE: int = 10
 
 
-def get_page_obj(request, queryset: QuerySet) -> Paginator:
+def get_page_obj(request, queryset: QuerySet,
+                 count: Optional[int] = None) -> Paginator:
     """Get page_obj from QuerySet"""
-    paginator: Paginator = Paginator(queryset, POSTS_ON_PAGE)
+    paginator: CursorPaginator = CursorPaginator(queryset, POSTS_ON_PAGE,
+                                                 count=count)
+    cursor: str = request.GET.get('cursor')
+    if cursor:
+        return paginator.get_cursor_page(cursor)
     page_num: int = request.GET.get('page')
     return paginator.get_page(page_num)
 
 
+def get_timeline_page(request) -> Optional[Page]:
+    """Numbered page of index read from timeline, None past its end."""
+    if request.GET.get('cursor'):
+        return None
+    try:
+        number: int = int(request.GET.get('page', 1))
+    except ValueError:
+        number = 1
+    if number < 1 or number * POSTS_ON_PAGE > get_timeline_size():
+        return None
+    # Estimate may run ahead of deleted posts, a short page then falls
+    # back to posts, which are counted for real.
+    paginator: TimelinePaginator = TimelinePaginator(
+        TimelineEntry.objects.all(), POSTS_ON_PAGE,
+        count=estimate_count(Post.objects.all())
+    )
+    page: Page = paginator.get_page(number)
+    expected: int = min(POSTS_ON_PAGE,
+                        paginator.count - (page.number - 1) * POSTS_ON_PAGE)
+    if len(page) < expected:
+        # Timeline was never built or is behind, read posts instead.
+        return None
+    return page
+
+
+@condition(etag_func=feed_etag(index_feed))
+@cache_feed_page(index_feed)
 def index(request) -> HttpResponse:
     """Rendering posts page."""
-    posts: QuerySet = Post.objects.select_related('author', 'group')
-    page_obj: Paginator = get_page_obj(request, posts)
+    page_obj: Optional[Page] = get_timeline_page(request)
+    if page_obj is None:
+        posts: QuerySet = Post.objects.visible().select_related(
+            'author', 'group'
+        )
+        page_obj = get_page_obj(request, posts)
 
     context: Dict[str, Paginator] = {'page_obj': page_obj}
     return render(request, 'posts/index.html', context)
 
 
+@condition(etag_func=feed_etag(group_feed))
+@cache_feed_page(group_feed)
 def group_posts(request, slug: str) -> HttpResponse:
     """Rendering group posts page."""
-    group: Union[Group, HttpResponse] = get_object_or_404(Group, slug=slug)
-    posts: QuerySet = group.posts.select_related('author')
-    page_obj: Paginator = get_page_obj(request, posts)
+    group: Group = lookups.groups.get_or_404(slug, is_hidden=False)
+    posts: QuerySet = group.posts.visible().select_related('author')
+    page_obj: Paginator = get_page_obj(request, posts, group.posts_count)
 
     context: Dict[str, Union[Group, Paginator]] = {
         'group': group,
@@ -42,12 +91,15 @@ def group_posts(request, slug: str) -> HttpResponse:
     return render(request, 'posts/group_list.html', context)
 
 
+@condition(etag_func=feed_etag(profile_feed))
+@cache_feed_page(profile_feed)
 def profile(request, username: str) -> HttpResponse:
     """Rendering profile page."""
-    author: Union[User, HttpResponse] = get_object_or_404(User,
-                                                          username=username)
-    posts: QuerySet = author.posts.select_related('group')
-    page_obj: Paginator = get_page_obj(request, posts)
+    author: User = lookups.users.get_or_404(username, is_active=True)
+    posts: QuerySet = author.posts.visible().select_related('group')
+    page_obj: Paginator = get_page_obj(
+        request, posts, AuthorCounter.get_posts_count(author)
+    )
 
     context: Dict[str, Union[User, Paginator]] = {
         'author': author,
@@ -56,17 +108,73 @@ def profile(request, username: str) -> HttpResponse:
     return render(request, 'posts/profile.html', context)
 
 
+def search(request) -> HttpResponse:
+    """Rendering full text search page."""
+    form: SearchForm = SearchForm(request.GET or None)
+    posts: QuerySet = Post.objects.none()
+    if form.is_valid():
+        posts = Post.objects.visible().select_related('author', 'group')
+        if form.cleaned_data['group']:
+            posts = posts.filter(group__slug=form.cleaned_data['group'])
+        if form.cleaned_data['author']:
+            posts = posts.filter(
+                author__username=form.cleaned_data['author']
+            )
+        posts = search_posts(posts, form.cleaned_data['q'])
+    page_obj: Paginator = RankedPaginator(
+        posts, POSTS_ON_PAGE
+    ).get_page(request.GET.get('page'))
+    query: QueryDict = request.GET.copy()
+    query.pop('page', None)
+    query.pop('cursor', None)
+
+    context: Dict[str, Union[SearchForm, Paginator, str]] = {
+        'form': form,
+        'page_obj': page_obj,
+        'query_prefix': f'{query.urlencode()}&' if query else '',
+    }
+    return render(request, 'posts/search.html', context)
+
+
+def get_post(request, post_id: int) -> Optional[Post]:
+    """Visible post from object cache, looked up once per request."""
+    if not hasattr(request, '_post'):
+        post: Optional[Post] = lookups.posts.get(post_id)
+        request._post = post if post and post.is_visible else None
+    return request._post
+
+
+def get_post_page_feeds(post_id: int) -> List[str]:
+    """Feeds of author and group, whose names and counts page shows."""
+    post: Optional[Post] = lookups.posts.get(post_id)
+    return lookups.get_post_related_feeds(post) if post else []
+
+
+def post_detail_etag(request, post_id: int) -> Optional[str]:
+    post: Optional[Post] = get_post(request, post_id)
+    if post is None:
+        return None
+    return make_etag(request, post.modified.timestamp(), *(
+        get_feed_generation(feed)
+        for feed in lookups.get_post_related_feeds(post)
+    ))
+
+
+# No last_modified_func: If-Modified-Since alone would answer 304
+# without the ETag telling guest and author pages apart.
+@condition(etag_func=post_detail_etag)
+@cache_feed_page(post_feed, get_post_page_feeds)
 def post_detail(request, post_id: int) -> HttpResponse:
     """Rendering post detail page."""
-    post: Union[Post, HttpResponse] = get_object_or_404(
-        Post.objects.select_related('group', 'author'),
-        id=post_id
-    )
+    post: Optional[Post] = get_post(request, post_id)
+    if post is None:
+        raise Http404('No Post matches the given query.')
     context: Dict[str, Post] = {'post': post}
     return render(request, 'posts/post_detail.html', context)
 
 
 @login_required
+@retry_on_locked
 def post_create(request):
     """Creating post form."""
     form: PostForm = PostForm(request.POST or None)
@@ -80,10 +188,11 @@ def post_create(request):
 
 
 @login_required
+@retry_on_locked
 def post_edit(request, post_id: int):
     """Editing post form."""
-    post: Union[Group, HttpResponse] = get_object_or_404(Post, id=post_id)
-    if post.author != request.user:
+    post: Post = lookups.posts.get_or_404(post_id)
+    if post.author_id != request.user.pk:
         return redirect(post)
     is_edit: bool = True
     form: PostForm = PostForm(request.POST or None, instance=post)
@@ -1,3 +1,5 @@
+from typing import Dict
+
 from django.contrib.auth.views import LoginView, LogoutView
 from django.urls import path
 
@@ -29,3 +31,12 @@ urlpatterns = [
         name='login'
     ),
 ]
+
+# Most queries a request may run, checked by core.middleware.query_budget.
+query_budgets: Dict[str, int] = {
+    'signup': 5,
+    'password_change': 12,
+    'password_change_done': 2,
+    'logout': 4,
+    'login': 9,
+}
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
 import os
+import tempfile
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -49,13 +50,18 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.timing.ServerTimingMiddleware',
+    'core.middleware.query_budget.QueryBudgetMiddleware',
+    'core.middleware.slow_queries.SlowQueryMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'posts.middleware.AnonymousPageCacheMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.profiling.SamplingProfilerMiddleware',
 ]
 
 
@@ -64,7 +70,8 @@ ROOT_URLCONF = 'yatube.urls'
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates timing renders for Server-Timing and /metrics.
+        'BACKEND': 'core.template_backends.TimedDjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -89,9 +96,102 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': 60,
     }
 }
 
+# Applied to every new SQLite connection by core.sqlite.
+# WAL lets readers go on while post_create writes.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+# Write views retry "database is locked" with exponential backoff.
+SQLITE_LOCKED_RETRIES = 5
+SQLITE_LOCKED_BACKOFF = 0.05
+
+
+# Cache
+# https://docs.djangoproject.com/en/2.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Rendered post cards, see templates/includes/post_plan.html.
+    'template_fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'template_fragments',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    # Slow query buffer, on disk to be read by the slow_queries command.
+    # Processes may lose single updates of each other here, memcached
+    # makes the counts exact, see core.slow_queries.
+    'slow_queries': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(tempfile.gettempdir(), 'yatube_slow_queries'),
+    },
+}
+
+# Anonymous pages served from cache, see posts.middleware.
+FEED_CACHE_PAGES = 3
+FEED_CACHE_TIMEOUT = 60 * 15
+# max-age of those pages for proxies, which see no invalidation.
+PAGE_CACHE_MAX_AGE = 60
+
+# core.cache.get_or_compute: one worker recomputes an entry, others get
+# the stale one kept CACHE_STALE_TIMEOUT past expiry.
+CACHE_LOCK_TIMEOUT = 10
+CACHE_STALE_TIMEOUT = 60 * 5
+CACHE_EARLY_REFRESH_BETA = 1.0
+
+# Post by id, Group by slug and User by username, see posts.lookups.
+# Missing ones are remembered for OBJECT_CACHE_MISS_TIMEOUT seconds.
+OBJECT_CACHE_TIMEOUT = 60 * 15
+OBJECT_CACHE_MISS_TIMEOUT = 30
+
+# Latest posts kept in posts.TimelineEntry for first pages of index.
+TIMELINE_SIZE = 1000
+
+
+# Query budgets are declared as query_budgets in app urls modules.
+# Strict mode raises on overrun or N+1 instead of logging a warning.
+QUERY_BUDGET_STRICT = False
+QUERY_BUDGET_REPEAT_LIMIT = 3
+
+# Share of requests profiled per URL name, '*' for the rest, see
+# core.middleware.profiling and the profile_report command.
+PROFILE_SAMPLE_RATES = {}
+PROFILE_DIR = os.path.join(BASE_DIR, 'profiles')
+PROFILE_MAX_FILES = 500
+
+# Server-Timing on every response, request metrics of these URL
+# namespaces served at /metrics to METRICS_ALLOWED_IPS.
+METRICS_NAMESPACES = ('posts', 'users', 'about')
+METRICS_ALLOWED_IPS = ('127.0.0.1',)
+
+# Statements slower than this many seconds are logged with their plan
+# into a buffer of distinct shapes, see core.slow_queries.
+SLOW_QUERY_THRESHOLD = 0.1
+SLOW_QUERY_BUFFER_SIZE = 200
+SLOW_QUERY_CACHE = 'slow_queries'
+
+
+# Sessions and request.user come from LocalCache in front of the
+# default cache, see core.sessions and core.auth. Logouts and password
+# changes reach other processes within LOCAL_CACHE_TIMEOUT only when
+# the default cache is shared between them: with LocMemCache other
+# processes keep users for 15 minutes and sessions until they expire.
+# check --deploy warns about it (core.W001).
+SESSION_ENGINE = 'core.sessions'
+AUTHENTICATION_BACKENDS = ['core.auth.CachedModelBackend']
+LOCAL_CACHE_SIZE = 1000
+LOCAL_CACHE_TIMEOUT = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
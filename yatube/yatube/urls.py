@@ -1,11 +1,14 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from core.views import metrics_view
+
 
 urlpatterns = [
     path('auth/', include('users.urls', namespace='users')),
     path('auth/', include('django.contrib.auth.urls')),
     path('about/', include('about.urls', namespace='about')),
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),
     path('', include('posts.urls', namespace='posts')),
 ]